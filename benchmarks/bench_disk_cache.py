@@ -0,0 +1,71 @@
+"""
+Compares reads through a slow manager with and without a DiskCache.
+
+Usage: python benchmarks/bench_disk_cache.py [number of reads]
+"""
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, IO
+
+from resource_resolver import ResourceResolver
+from resource_resolver.core.managers import DiskCache, FileManager
+
+LATENCY = 0.05
+
+
+class SlowManager(FileManager):
+    """
+    Stands in for a remote resource by delaying every read of a local file.
+    """
+
+    def __init__(self, location: str):
+        super().__init__(Path(location[len('slow://'):]))
+
+    @staticmethod
+    def test(location: Any) -> bool:
+        return isinstance(location, str) and bool(re.match(r'^slow://', location))
+
+    def get(self) -> IO[str]:
+        time.sleep(LATENCY)
+        return super().get()
+
+
+def timed_reads(resolver: ResourceResolver, key: str, n_reads: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n_reads):
+        resolver.get(key)
+    return time.perf_counter() - start
+
+
+def main():
+    n_reads = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        source = root / 'source.csv'
+        source.write_text('id,value\n' * 100_000)
+        location = f'slow://{source}'
+
+        resolver = ResourceResolver()
+        resolver.define('uncached', location)
+        resolver.define('cached', location, cache=DiskCache(root / 'cache'))
+
+        uncached = timed_reads(resolver, 'uncached', n_reads)
+        cached = timed_reads(resolver, 'cached', n_reads)
+
+        # A second resolver stands in for another worker on the same node.
+        worker = ResourceResolver()
+        worker.define('cached', location, cache=DiskCache(root / 'cache'))
+        shared = timed_reads(worker, 'cached', n_reads)
+
+        print(f'uncached: {uncached / n_reads * 1000:8.2f} ms/read')
+        print(f'  cached: {cached / n_reads * 1000:8.2f} ms/read')
+        print(f'  shared: {shared / n_reads * 1000:8.2f} ms/read')
+        resolver.clear()
+        worker.clear()
+
+
+if __name__ == '__main__':
+    main()
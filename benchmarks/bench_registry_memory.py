@@ -0,0 +1,44 @@
+"""
+Measures the memory overhead per key of defining resources which are not
+used.
+
+Usage: python benchmarks/bench_registry_memory.py [number of keys]
+"""
+import gc
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from resource_resolver import ResourceResolver
+
+
+def measure(n_keys: int, make_location) -> float:
+    resolver = ResourceResolver()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(n_keys):
+        resolver.define(f'partition-{i}', make_location(i))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    resolver.clear()
+    return (after - before) / n_keys
+
+
+def main():
+    n_keys = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        cases = {
+            'tmp url': lambda i: f'tmp://partition-{i}',
+            'file url': lambda i: f'file://{root}/partition-{i}.csv',
+            'path': lambda i: root / f'partition-{i}.csv',
+        }
+        for name, make_location in cases.items():
+            per_key = measure(n_keys, make_location)
+            print(f'{name:>10}: {per_key:8.1f} bytes/key over {n_keys} keys')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Contains the bookkeeping for resources derived from other resources.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from pathlib import Path
+from types import CodeType
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+from .proxy import ResourceProxy
+
+logger = logging.getLogger(__name__)
+
+
+class Derivation:
+    """
+    Records how a derived resource is computed from its inputs, and the
+    fingerprints of the inputs and output when it was last computed.
+
+    The record is persisted to a state resource if one is supplied, so an
+    up to date result is reused by later processes.
+    """
+    __slots__ = ('key', 'inputs', 'fn', 'version', 'lock', '_state',
+                 '_state_proxy')
+
+    def __init__(self, key: str, inputs: Sequence[str],
+                 fn: Callable[..., Any],
+                 state_proxy: Optional[ResourceProxy] = None,
+                 version: Optional[str] = None):
+        self.key = key
+        self.inputs = list(inputs)
+        self.fn = fn
+        self.version = version
+        self.lock = threading.Lock()
+        self._state: Optional[Dict[str, str]] = None
+        self._state_proxy = state_proxy
+
+    @property
+    def state(self) -> Dict[str, str]:
+        if self._state is None:
+            self._state = self._load_state()
+        return self._state
+
+    @state.setter
+    def state(self, state: Dict[str, str]) -> None:
+        self._state = state
+        if self._state_proxy is not None:
+            self._state_proxy.put(json.dumps(state))
+
+    def combine(self, input_fingerprints: Sequence[str]) -> str:
+        """
+        Produces a fingerprint of the derived value from the fingerprints of
+        its inputs, the version and a description of the function which
+        computes it.
+
+        The description covers the function's own code, constants and names,
+        its defaults, and the values captured in its closure, identified by
+        repr. Values whose repr varies between processes cause the result to
+        be recomputed. Changes to other functions it calls are not detected.
+        """
+        digest = hashlib.sha256()
+        fn = self.fn
+        name = f'{getattr(fn, "__module__", "")}.' \
+               f'{getattr(fn, "__qualname__", repr(fn))}'
+        digest.update(name.encode('utf-8'))
+        digest.update(f'\0{self.version}'.encode('utf-8'))
+        code = getattr(fn, '__code__', None)
+        if code is not None:
+            _update_with_code(digest, code)
+        digest.update(repr(getattr(fn, '__defaults__', None)).encode('utf-8'))
+        digest.update(repr(getattr(fn, '__kwdefaults__', None))
+                      .encode('utf-8'))
+        for cell in getattr(fn, '__closure__', None) or ():
+            try:
+                contents = repr(cell.cell_contents)
+            except ValueError:
+                contents = '<empty>'
+            digest.update(f'\0{contents}'.encode('utf-8'))
+        for key, fingerprint in zip(self.inputs, input_fingerprints):
+            digest.update(f'\0{key}\0{fingerprint}'.encode('utf-8'))
+        return f'derived:{digest.hexdigest()}'
+
+    def _load_state(self) -> Dict[str, str]:
+        if self._state_proxy is None:
+            return {}
+        try:
+            state = json.loads(self._state_proxy.get(as_a='str') or '{}')
+        except ValueError:
+            logger.warning(f'Ignoring invalid state for derived resource '
+                           f'{self.key}.')
+            return {}
+        return state if isinstance(state, dict) else {}
+
+
+def _update_with_code(digest: Any, code: CodeType) -> None:
+    """
+    Adds the bytecode, names and constants of a code object, including
+    nested code objects, to a digest.
+    """
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode('utf-8'))
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            _update_with_code(digest, const)
+        else:
+            digest.update(f'\0{const!r}'.encode('utf-8'))
+
+
+def default_state_location(location: Any) -> Optional[Path]:
+    """
+    Returns a sidecar file next to a file resource in which to store the
+    state of a derived resource, or None if the location is not a file.
+    """
+    if isinstance(location, Path):
+        path = location
+    elif isinstance(location, str) and location.startswith('file://'):
+        path = Path(location[7:])
+    else:
+        return None
+    return path.with_name(f'{path.name}.derived.json')
+
+
+def run_in_dependency_order(dependencies: Dict[str, List[str]],
+                            run: Callable[[str], None],
+                            executor: Executor) -> None:
+    """
+    Calls run for every key in dependencies once all of the keys it depends
+    on have finished. Keys whose dependencies are satisfied run in parallel
+    on the executor.
+    """
+    if len(dependencies) == 1:
+        run(next(iter(dependencies)))
+        return
+
+    pending = dict(dependencies)
+    done: Set[str] = set()
+    running: Dict[Future, str] = {}
+    try:
+        while pending or running:
+            ready = [key for key, needs in pending.items()
+                     if all(need in done for need in needs)]
+            for key in ready:
+                del pending[key]
+                running[executor.submit(run, key)] = key
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                done.add(running.pop(future))
+                future.result()
+    finally:
+        # Do not leave computations running once the caller has returned.
+        wait(running)
@@ -8,10 +8,27 @@ class ResourceResolverError(Exception):
     Encapsulates errors generated by the ResourceResolver class.
     """
 
+    @classmethod
+    def AsyncWriteInEventLoop(cls, location: Any,
+                              alternative: str) -> ResourceResolverError:
+        return cls(f"Cannot write an async iterable to {location} "
+                   "synchronously from a running event loop. "
+                   f"Use {alternative} instead.")
+
+    @classmethod
+    def CyclicDerivation(cls, key: str) -> ResourceResolverError:
+        return cls(f"Cannot derive '{key}' since it would depend on itself.")
+
     @classmethod
     def DuplicateKey(cls, key: str) -> ResourceResolverError:
         return cls(f"Cannot define key '{key}' since key already exists.")
 
+    @classmethod
+    def HttpError(cls, url: str, status: int,
+                  reason: str) -> ResourceResolverError:
+        return cls(f"Request for '{url}' failed with status {status} "
+                   f"({reason}).")
+
     @classmethod
     def InvalidUrl(cls, url: str) -> ResourceResolverError:
         return cls(f"Url '{url}' is not valid.")
@@ -22,6 +39,11 @@ class ResourceResolverError(Exception):
                    f" {location}."
                    )
 
+    @classmethod
+    def ReadOnlyHandle(cls, location: Any) -> ResourceResolverError:
+        return cls(f"The handle for {location} is read-only. "
+                   "Write to the resource with save or append instead.")
+
     @classmethod
     def UnsupportedGetAsFormat(cls, format: Any, GET_AS_FORMATS: List[str]):
         return cls(f"Invalid format '{format}' requested from get. "
@@ -35,7 +57,8 @@ class ResourceResolverError(Exception):
     @classmethod
     def UnsupportedWriteType(cls, t: Any) -> ResourceResolverError:
         return cls(f"Cannot write type '{type(t)}'. "
-                   "Only string data is supported.")
+                   "Only strings, text streams and iterables of strings "
+                   "are supported.")
 
     @classmethod
     def UndefinedResource(cls, key: str) -> ResourceResolverError:
@@ -1,17 +1,43 @@
 from __future__ import annotations
 
+import codecs
+import hashlib
+import http.client
 import logging
+import os
 import re
 import shutil
+import sqlite3
 import tempfile
+import threading
+import time
 from abc import ABCMeta, abstractmethod, abstractstaticmethod
-from io import TextIOBase
+from contextlib import contextmanager
+from email.message import Message
+from io import StringIO, TextIOBase
 from pathlib import Path
-from typing import Any, IO, List, Optional, Type, Union, cast
+from typing import (Any, Dict, IO, Iterator, List, Mapping, Optional, Tuple,
+                    Type, Union, cast)
+from urllib.parse import urlsplit
 from weakref import finalize, proxy
 
+from .errors import ResourceResolverError
+
 logger = logging.getLogger(__name__)
 
+# The umask can only be read by changing it, which would race with files
+# being created by other threads, so it is read once on import.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def use_default_permissions(path: Union[str, Path]) -> None:
+    """
+    Gives a file created with tempfile.mkstemp, which only its owner can
+    access, the permissions of a file created with open.
+    """
+    os.chmod(path, 0o666 & ~_UMASK)
+
 
 class ManagerRegistry:
     _Managers: List[Type[ResourceManagerBase]] = []
@@ -56,9 +82,9 @@ class ResourceManagerMeta(ABCMeta):
 
 
 class ResourceManagerBase(metaclass=ResourceManagerMeta):
+    __slots__ = ('__weakref__',)
 
     def __init__(self, location: Any):
-        self._finalizer = finalize(self, self.close)
         ...
 
     @abstractstaticmethod
@@ -100,14 +126,71 @@ class ResourceManagerBase(metaclass=ResourceManagerMeta):
         """
         ...
 
+    def get_range(self, start: int, end: Optional[int] = None) -> str:
+        """
+        Returns the data between the byte offsets start and end (inclusive)
+        of the UTF-8 encoded resource. If end is None, the data from start to
+        the end of the resource is returned.
+
+        The default implementation reads the full resource. Managers which
+        can perform partial reads should override it.
+        """
+        data = self.get().read().encode('utf-8')
+        stop = None if end is None else end + 1
+        return data[start:stop].decode('utf-8', errors='replace')
+
+    def is_current(self, fingerprint: str) -> bool:
+        """
+        Returns true if the data stored at the location still matches a
+        fingerprint previously returned by fingerprint.
+
+        The default implementation recomputes the fingerprint. Managers which
+        can check it more cheaply, for example with a conditional request,
+        should override it.
+        """
+        return self.fingerprint() == fingerprint
+
+    def snapshot(self) -> Tuple[str, IO[str]]:
+        """
+        Returns the fingerprint of the resource together with a stream of the
+        data it identifies.
+
+        The default implementation takes the fingerprint before the data, so
+        a change in between makes the data look stale rather than current.
+        Managers which obtain both from one request should override it.
+        """
+        fingerprint = self.fingerprint()
+        return fingerprint, self.get()
+
+    def fingerprint(self) -> str:
+        """
+        Returns a string which changes whenever the data stored at the
+        location changes.
+
+        The default implementation hashes the full contents of the resource.
+        Managers which can detect changes more cheaply should override it.
+        """
+        digest = hashlib.sha256()
+        stream = self.get()
+        for chunk in iter(lambda: stream.read(65536), ''):
+            digest.update(chunk.encode('utf-8'))
+        return f'sha256:{digest.hexdigest()}'
+
 
 class FileManager(ResourceManagerBase):
     """
     Implements management of a file resource.
+
+    The file is fingerprinted by its size and modification time. If the
+    resource is defined with content_hash=True, it is fingerprinted by a hash
+    of its contents instead, which also detects changes that preserve both,
+    at the cost of reading the whole file.
     """
+    __slots__ = ('_path', '_url', '_fp', '_finalizer', '_content_hash')
 
-    def __init__(self, location: Union[str, Path]):
+    def __init__(self, location: Union[str, Path], content_hash: bool = False):
         super().__init__(location)
+        self._content_hash = content_hash
         if issubclass(type(location), Path):
             self._path = cast(Path, location)
         else:
@@ -116,6 +199,7 @@ class FileManager(ResourceManagerBase):
             self._path = Path(self._url)
 
         self._fp = self._path.open(mode='a+', encoding='utf-8')
+        self._finalizer = finalize(self, self._fp.close)
 
     @staticmethod
     def test(location: Any) -> bool:
@@ -136,15 +220,24 @@ class FileManager(ResourceManagerBase):
         data.seek(0, 0)
         self._fp.truncate()
         shutil.copyfileobj(data, self._fp)
+        self._fp.flush()
 
     def append(self, data: IO[str]) -> None:
         data.seek(0, 0)
         shutil.copyfileobj(data, self._fp)
+        self._fp.flush()
 
     def get(self) -> IO[str]:
         self._fp.seek(0, 0)
         return proxy(self._fp)
 
+    def fingerprint(self) -> str:
+        self._fp.flush()
+        if self._content_hash:
+            return super().fingerprint()
+        stat = self._path.stat()
+        return f'stat:{self._path}:{stat.st_size}:{stat.st_mtime_ns}'
+
     def close(self):
         try:
             self._fp.close()
@@ -157,10 +250,12 @@ class TempManager(ResourceManagerBase):
     Implements management of a temporary resource. The backing IO for a 
     temporary resource is not guaranteed to be fixed.
     """
+    __slots__ = ('_fp', '_finalizer')
 
     def __init__(self, location: Any):
         super().__init__(location)
         self._fp = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+        self._finalizer = finalize(self, self._fp.close)
 
         if issubclass(type(location), TextIOBase):
             location.seek(0, 0)
@@ -185,6 +280,7 @@ class TempManager(ResourceManagerBase):
 
     def append(self, data: IO[str]) -> None:
         data.seek(0, 0)
+        self._fp.seek(0, 2)
         shutil.copyfileobj(data, self._fp)
 
     def get(self) -> IO[str]:
@@ -196,3 +292,788 @@ class TempManager(ResourceManagerBase):
             self._fp.close()
         except Exception as e:
             logging.exception(e)
+
+
+class HttpConnectionPool:
+    """
+    Holds idle keep-alive connections so that they can be reused by
+    subsequent requests to the same host.
+    """
+
+    def __init__(self, max_idle_per_host: int = 4):
+        self._max_idle_per_host = max_idle_per_host
+        self._idle: Dict[Tuple[str, str], List[http.client.HTTPConnection]] \
+            = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, scheme: str, netloc: str,
+                timeout: Optional[float]) -> http.client.HTTPConnection:
+        """
+        Returns an idle connection to the host if one is available,
+        otherwise opens a new one.
+        """
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop()
+        return self.connect(scheme, netloc, timeout)
+
+    @staticmethod
+    def connect(scheme: str, netloc: str,
+                timeout: Optional[float]) -> http.client.HTTPConnection:
+        """Opens a new connection to the host."""
+        logger.debug(f'Opening new {scheme} connection to {netloc}.')
+        if scheme == 'https':
+            return http.client.HTTPSConnection(netloc, timeout=timeout)
+        return http.client.HTTPConnection(netloc, timeout=timeout)
+
+    def release(self, scheme: str, netloc: str,
+                connection: http.client.HTTPConnection) -> None:
+        """
+        Returns a connection whose last response has been fully read to the
+        pool.
+        """
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if len(idle) < self._max_idle_per_host:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def clear(self) -> None:
+        """Closes all idle connections."""
+        with self._lock:
+            connections = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for connection in connections:
+            connection.close()
+
+
+_http_pool = HttpConnectionPool()
+
+
+class HttpManager(ResourceManagerBase):
+    """
+    Implements read-only management of a resource served over HTTP(S).
+
+    Response bodies are streamed into a local temporary file. Subsequent
+    reads revalidate the local copy using the ETag and Last-Modified
+    response headers, so unchanged resources are not downloaded again.
+    """
+    __slots__ = ('_url', '_scheme', '_netloc', '_target', '_headers',
+                 '_timeout', '_pool', '_fp', '_etag', '_last_modified',
+                 '_prefetched')
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, location: str,
+                 headers: Optional[Mapping[str, str]] = None,
+                 timeout: Optional[float] = 30.0,
+                 pool: Optional[HttpConnectionPool] = None):
+        super().__init__(location)
+        self._url = location
+        parts = urlsplit(location)
+        self._scheme = parts.scheme
+        self._netloc = parts.netloc
+        self._target = parts.path or '/'
+        if parts.query:
+            self._target += f'?{parts.query}'
+        self._headers = dict(headers or {})
+        self._timeout = timeout
+        self._pool = pool if pool is not None else _http_pool
+        self._fp: Optional[IO[str]] = None
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._prefetched = False
+
+    @staticmethod
+    def test(location: Any) -> bool:
+        if not isinstance(location, str):
+            return False
+
+        url = cast(str, location)
+        pattern = r'^https?://'
+        match = re.match(pattern, url)
+
+        return bool(match)
+
+    def put(self, data: IO[str]) -> None:
+        raise ResourceResolverError.ReadOnly(self._url)
+
+    def append(self, data: IO[str]) -> None:
+        raise ResourceResolverError.ReadOnly(self._url)
+
+    def get(self) -> IO[str]:
+        self._revalidate()
+        fp = cast(IO[str], self._fp)
+        fp.seek(0, 0)
+        return proxy(fp)
+
+    def get_range(self, start: int, end: Optional[int] = None) -> str:
+        stop = '' if end is None else str(end)
+        headers = {'Range': f'bytes={start}-{stop}'}
+        connection, response = self._request(headers)
+        try:
+            if response.status == 206:
+                data = response.read()
+            elif response.status == 200:
+                # The server ignored the range, so skip to the requested bytes.
+                data = self._read_slice(response, start, end)
+            elif response.status == 416:
+                response.read()
+                data = b''
+            else:
+                response.read()
+                raise ResourceResolverError.HttpError(self._url,
+                                                      response.status,
+                                                      response.reason)
+        except BaseException:
+            connection.close()
+            raise
+        self._finish(connection, response)
+        return data.decode(self._charset(response), errors='replace')
+
+    def fingerprint(self) -> str:
+        self._revalidate()
+        return self._local_fingerprint()
+
+    def snapshot(self) -> Tuple[str, IO[str]]:
+        # A body downloaded by a failed is_current is used as it is, rather
+        # than being revalidated immediately afterwards.
+        if not self._prefetched:
+            self._revalidate()
+        self._prefetched = False
+        fingerprint = self._local_fingerprint()
+        fp = cast(IO[str], self._fp)
+        fp.seek(0, 0)
+        return fingerprint, proxy(fp)
+
+    def is_current(self, fingerprint: str) -> bool:
+        headers = {}
+        for prefix, header in ((f'etag:{self._url}:', 'If-None-Match'),
+                               (f'last-modified:{self._url}:',
+                                'If-Modified-Since')):
+            if fingerprint.startswith(prefix):
+                headers[header] = fingerprint[len(prefix):]
+        if not headers:
+            return super().is_current(fingerprint)
+
+        connection, response = self._request(headers)
+        try:
+            if response.status == 304:
+                response.read()
+                current = True
+            elif response.status == 200:
+                # Keep the body so that it is not downloaded again.
+                self._store(response)
+                self._prefetched = True
+                current = self._local_fingerprint() == fingerprint
+            else:
+                response.read()
+                raise ResourceResolverError.HttpError(self._url,
+                                                      response.status,
+                                                      response.reason)
+        except BaseException:
+            connection.close()
+            raise
+        self._finish(connection, response)
+        return current
+
+    def close(self):
+        try:
+            if self._fp is not None:
+                self._fp.close()
+        except Exception as e:
+            logging.exception(e)
+
+    def _local_fingerprint(self) -> str:
+        """Fingerprints the local copy of the resource."""
+        if self._etag:
+            return f'etag:{self._url}:{self._etag}'
+        if self._last_modified:
+            return f'last-modified:{self._url}:{self._last_modified}'
+        digest = hashlib.sha256()
+        fp = cast(IO[str], self._fp)
+        fp.seek(0, 0)
+        for chunk in iter(lambda: fp.read(self.CHUNK_SIZE), ''):
+            digest.update(chunk.encode('utf-8'))
+        return f'sha256:{digest.hexdigest()}'
+
+    def _revalidate(self) -> None:
+        """
+        Downloads the resource unless the local copy is known to be current.
+        """
+        self._prefetched = False
+        headers = {}
+        if self._fp is not None:
+            if self._etag:
+                headers['If-None-Match'] = self._etag
+            if self._last_modified:
+                headers['If-Modified-Since'] = self._last_modified
+
+        connection, response = self._request(headers)
+        try:
+            if response.status == 304 and self._fp is not None:
+                response.read()
+                logger.debug(f'Resource at {self._url} is unchanged.')
+            elif response.status == 200:
+                self._store(response)
+            else:
+                response.read()
+                raise ResourceResolverError.HttpError(self._url,
+                                                      response.status,
+                                                      response.reason)
+        except BaseException:
+            connection.close()
+            raise
+        self._finish(connection, response)
+
+    def _store(self, response: http.client.HTTPResponse) -> None:
+        """Streams a response body into a new local copy of the resource."""
+        fp = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+        decoder = codecs.getincrementaldecoder(self._charset(response))()
+        try:
+            for chunk in iter(lambda: response.read(self.CHUNK_SIZE), b''):
+                fp.write(decoder.decode(chunk))
+            fp.write(decoder.decode(b'', final=True))
+        except BaseException:
+            fp.close()
+            raise
+        if self._fp is not None:
+            self._fp.close()
+        self._fp = fp
+        self._etag = response.getheader('ETag')
+        self._last_modified = response.getheader('Last-Modified')
+
+    def _request(self, headers: Mapping[str, str]
+                 ) -> Tuple[http.client.HTTPConnection,
+                            http.client.HTTPResponse]:
+        """
+        Sends a GET request for the resource, retrying once if a pooled
+        connection turns out to have been closed by the server.
+        """
+        headers = {**self._headers, **headers}
+        connection = self._pool.acquire(self._scheme, self._netloc,
+                                        self._timeout)
+        try:
+            return self._send(connection, headers)
+        except (http.client.RemoteDisconnected, ConnectionResetError,
+                BrokenPipeError):
+            logger.debug(f'Retrying request for {self._url} on a new '
+                         'connection.')
+        connection = self._pool.connect(self._scheme, self._netloc,
+                                        self._timeout)
+        return self._send(connection, headers)
+
+    def _send(self, connection: http.client.HTTPConnection,
+              headers: Mapping[str, str]
+              ) -> Tuple[http.client.HTTPConnection,
+                         http.client.HTTPResponse]:
+        try:
+            connection.request('GET', self._target, headers=dict(headers))
+            return connection, connection.getresponse()
+        except BaseException:
+            connection.close()
+            raise
+
+    def _finish(self, connection: http.client.HTTPConnection,
+                response: http.client.HTTPResponse) -> None:
+        if response.will_close:
+            connection.close()
+        else:
+            self._pool.release(self._scheme, self._netloc, connection)
+
+    def _read_slice(self, response: http.client.HTTPResponse,
+                    start: int, end: Optional[int]) -> bytes:
+        data = bytearray()
+        offset = 0
+        stop = None if end is None else end + 1
+        for chunk in iter(lambda: response.read(self.CHUNK_SIZE), b''):
+            # Data past the end of the range is read only to drain the
+            # response, so that the connection can be reused.
+            if stop is None or offset < stop:
+                chunk_stop = None if stop is None else stop - offset
+                data += chunk[max(start - offset, 0):chunk_stop]
+            offset += len(chunk)
+        return bytes(data)
+
+    @staticmethod
+    def _charset(response: http.client.HTTPResponse) -> str:
+        message = Message()
+        message['Content-Type'] = response.getheader('Content-Type',
+                                                     'text/plain')
+        return message.get_content_charset() or 'utf-8'
+
+
+class PackedStore:
+    """
+    Stores many resources as rows of a single SQLite database.
+
+    Connections are drawn from a small pool, so the number held open is
+    bounded by the number of concurrent operations rather than the number of
+    threads which have used the store. They are opened in WAL mode so that
+    readers are not blocked by a writer. Writes outside a batch are committed
+    immediately.
+    """
+    _stores: Dict[Path, PackedStore] = {}
+    _stores_lock = threading.Lock()
+
+    def __init__(self, path: Union[str, Path], timeout: float = 30.0,
+                 max_idle_connections: int = 2):
+        self._path = Path(path)
+        self._timeout = timeout
+        self._max_idle_connections = max_idle_connections
+        self._local = threading.local()
+        self._idle: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        with self._connection() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS resources ('
+                'key TEXT PRIMARY KEY, '
+                'data TEXT NOT NULL, '
+                'revision INTEGER NOT NULL)')
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> PackedStore:
+        """
+        Returns the store for the database at path, opening it if this
+        process has not already done so.
+        """
+        resolved = Path(path).resolve()
+        with cls._stores_lock:
+            store = cls._stores.get(resolved)
+            if store is None:
+                store = cls._stores[resolved] = cls(resolved)
+            return store
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def read(self, key: str) -> Optional[str]:
+        """Returns the data stored under key, or None if there is none."""
+        with self._connection() as connection:
+            row = connection.execute(
+                'SELECT data FROM resources WHERE key = ?', (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def revision(self, key: str) -> int:
+        """
+        Returns a counter which is incremented whenever key is written.
+        """
+        with self._connection() as connection:
+            row = connection.execute(
+                'SELECT revision FROM resources WHERE key = ?',
+                (key,)).fetchone()
+        return 0 if row is None else row[0]
+
+    def write(self, key: str, data: str) -> None:
+        """Overwrites the data stored under key."""
+        with self._connection() as connection:
+            connection.execute(
+                'INSERT INTO resources (key, data, revision) '
+                'VALUES (?, ?, 1) '
+                'ON CONFLICT (key) DO UPDATE SET data = excluded.data, '
+                'revision = revision + 1', (key, data))
+
+    def append(self, key: str, data: str) -> None:
+        """Appends to the data stored under key."""
+        with self._connection() as connection:
+            connection.execute(
+                'INSERT INTO resources (key, data, revision) '
+                'VALUES (?, ?, 1) '
+                'ON CONFLICT (key) DO UPDATE SET data = data || excluded.data, '
+                'revision = revision + 1', (key, data))
+
+    @contextmanager
+    def batch(self) -> Iterator[PackedStore]:
+        """
+        Groups the writes made by the current thread into one transaction,
+        which is committed on exit or rolled back if an error is raised.
+        Nested batches join the outermost one.
+        """
+        if getattr(self._local, 'connection', None) is not None:
+            yield self
+            return
+        connection = self._acquire()
+        self._local.connection = connection
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                yield self
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('COMMIT')
+        finally:
+            self._local.connection = None
+            self._release(connection)
+
+    def close(self) -> None:
+        """
+        Closes the idle connections to the database. The store remains
+        usable, and opens new connections as they are needed, so managers
+        holding it and later calls to open share one store.
+        """
+        with self._lock:
+            connections, self._idle = self._idle, []
+        for connection in connections:
+            self._close_connection(connection)
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Yields the connection of the current thread's batch, or a pooled
+        connection if the thread is not in a batch.
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            yield connection
+            return
+        connection = self._acquire()
+        try:
+            yield connection
+        finally:
+            self._release(connection)
+
+    def _acquire(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        connection = sqlite3.connect(str(self._path),
+                                     timeout=self._timeout,
+                                     isolation_level=None,
+                                     check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    def _release(self, connection: sqlite3.Connection) -> None:
+        with self._lock:
+            if len(self._idle) < self._max_idle_connections:
+                self._idle.append(connection)
+                return
+        self._close_connection(connection)
+
+    @staticmethod
+    def _close_connection(connection: sqlite3.Connection) -> None:
+        try:
+            connection.close()
+        except Exception as e:
+            logging.exception(e)
+
+
+class ReadOnlyStringIO(StringIO):
+    """
+    A copy of a resource's data which refuses writes, so that writes made
+    through a handle which cannot persist them are not silently lost.
+    """
+
+    def __init__(self, data: str, location: Any):
+        super().__init__(data)
+        self._location = location
+
+    def writable(self) -> bool:
+        return False
+
+    def write(self, s: str) -> int:
+        raise ResourceResolverError.ReadOnlyHandle(self._location)
+
+    def writelines(self, lines: Any) -> None:
+        raise ResourceResolverError.ReadOnlyHandle(self._location)
+
+    def truncate(self, size: Optional[int] = None) -> int:
+        raise ResourceResolverError.ReadOnlyHandle(self._location)
+
+
+class SqliteManager(ResourceManagerBase):
+    """
+    Implements management of a resource stored as a row of a SQLite
+    database, addressed as sqlite:///path/to/store.db#key.
+
+    Many resources share one database file and a small pool of connections.
+    Each value is stored as a single row, so put and append read the
+    supplied data in full rather than streaming it. The stream returned by
+    get is a read-only copy of the stored data; writes must go through put
+    or append.
+    """
+    __slots__ = ('_url', '_key', '_store')
+    URL_PATTERN = re.compile(r'^sqlite://(?P<path>[^#]+)#(?P<key>.+)$')
+
+    def __init__(self, location: str):
+        super().__init__(location)
+        self._url = location
+        match = self.URL_PATTERN.match(location)
+        if not match:
+            raise ResourceResolverError.InvalidUrl(location)
+        self._key = match.group('key')
+        self._store = PackedStore.open(match.group('path'))
+
+    @staticmethod
+    def test(location: Any) -> bool:
+        if not isinstance(location, str):
+            return False
+
+        url = cast(str, location)
+        match = SqliteManager.URL_PATTERN.match(url)
+
+        return bool(match)
+
+    def put(self, data: IO[str]) -> None:
+        data.seek(0, 0)
+        self._store.write(self._key, data.read())
+
+    def append(self, data: IO[str]) -> None:
+        data.seek(0, 0)
+        self._store.append(self._key, data.read())
+
+    def get(self) -> IO[str]:
+        return ReadOnlyStringIO(self._store.read(self._key) or '', self._url)
+
+    def fingerprint(self) -> str:
+        revision = self._store.revision(self._key)
+        return f'sqlite:{self._store.path}:{self._key}:{revision}'
+
+    def close(self):
+        # The database connections are shared by every resource in the store.
+        ...
+
+
+class DiskCache:
+    """
+    A read-through cache of resource contents in a local directory.
+
+    The directory may be shared by every process on a node. Each entry is
+    stored with the fingerprint of the resource it was copied from, and is
+    validated with the manager's is_current before use, so a manager which
+    supports conditional requests does not download an unchanged resource
+    again. Managers which override neither fingerprint nor is_current can
+    only be validated by fetching the resource, so their entries are instead
+    used for max_age seconds after being stored and fetched again
+    afterwards. Entries are written to a temporary file and moved into place, so
+    concurrent fills never expose partial data. When the cache exceeds
+    max_bytes, the least recently used entries are removed.
+    """
+    ENV_DIRECTORY = 'RESOURCE_RESOLVER_CACHE_DIR'
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None,
+                 max_bytes: int = 1024 ** 3,
+                 validate: bool = True,
+                 max_age: float = 60.0):
+        if directory is None:
+            directory = os.environ.get(
+                self.ENV_DIRECTORY,
+                Path(tempfile.gettempdir()) / 'resource-resolver-cache')
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._validate = validate
+        self._max_age = max_age
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    @property
+    def validate(self) -> bool:
+        """
+        Whether entries are checked against the resource before being used.
+        """
+        return self._validate
+
+    def is_fresh(self, path: Path) -> bool:
+        """
+        Returns true if the entry at path was stored less than max_age
+        seconds ago.
+        """
+        try:
+            stored = self._token_path(path).stat().st_mtime
+        except FileNotFoundError:
+            return False
+        return time.time() - stored < self._max_age
+
+    def lookup(self, identity: str) -> Optional[Tuple[Path, str]]:
+        """
+        Returns the path of the most recently stored copy of the resource and
+        the fingerprint it was stored with, or None if there is no copy.
+        """
+        for path in sorted(self._entries(identity), key=self._mtime,
+                           reverse=True):
+            try:
+                fingerprint = self._token_path(path).read_text(
+                    encoding='utf-8')
+                os.utime(path)
+            except FileNotFoundError:
+                continue
+            return path, fingerprint
+        return None
+
+    def store(self, identity: str, fingerprint: str, data: IO[str]) -> Path:
+        """
+        Copies data into the cache and returns the path of the new entry.
+        """
+        path = self._entry_path(identity, fingerprint)
+        # The fingerprint is in place before the data, so an entry which is
+        # visible can always be validated.
+        self._write_atomically(self._token_path(path), StringIO(fingerprint))
+        self._write_atomically(path, data)
+        for stale in self._entries(identity):
+            if stale != path:
+                self._remove(stale)
+        self._evict(keep=path)
+        return path
+
+    def invalidate(self, identity: str) -> None:
+        """Removes every cached copy of the resource."""
+        for path in self._entries(identity):
+            self._remove(path)
+
+    def _write_atomically(self, path: Path, data: IO[str]) -> None:
+        fd, tmp_name = tempfile.mkstemp(dir=self._directory, prefix='.',
+                                        suffix='.tmp')
+        try:
+            with open(fd, 'w', encoding='utf-8') as fp:
+                shutil.copyfileobj(data, fp)
+            # The directory may be shared with other users' processes.
+            use_default_permissions(tmp_name)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def _entries(self, identity: str) -> List[Path]:
+        return list(self._directory.glob(f'{self._hash(identity)}-*.cache'))
+
+    def _entry_path(self, identity: str, fingerprint: str) -> Path:
+        name = f'{self._hash(identity)}-{self._hash(fingerprint)}.cache'
+        return self._directory / name
+
+    @staticmethod
+    def _token_path(path: Path) -> Path:
+        return path.with_suffix('.token')
+
+    def _remove(self, path: Path) -> None:
+        path.unlink(missing_ok=True)
+        self._token_path(path).unlink(missing_ok=True)
+
+    def _evict(self, keep: Path) -> None:
+        entries = []
+        for path in self._directory.glob('*.cache'):
+            if path == keep:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = keep.stat().st_size + sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self._max_bytes:
+                break
+            logger.debug(f'Evicting {path} from the disk cache.')
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _mtime(path: Path) -> float:
+        try:
+            return path.stat().st_mtime
+        except FileNotFoundError:
+            return 0.0
+
+    @staticmethod
+    def _hash(value: str) -> str:
+        return hashlib.sha256(value.encode('utf-8')).hexdigest()[:32]
+
+
+class CachingManager(ResourceManagerBase):
+    """
+    Serves reads of another manager's resource from a DiskCache.
+
+    This manager is never selected by location. It wraps the manager of a
+    resource defined with a cache argument. Writes made with put and append
+    go to the wrapped manager and invalidate the cached copy. The stream
+    returned by get is the cached copy opened for reading, so it cannot be
+    written to; helpers which write through a file handle, such as
+    save_dataframe_csv, are not supported for cached resources.
+    """
+    __slots__ = ('_inner', '_cache', '_identity', '_fp')
+
+    def __init__(self, location: Any, inner: ResourceManagerBase,
+                 cache: DiskCache):
+        super().__init__(location)
+        self._inner = inner
+        self._cache = cache
+        self._identity = f'{type(inner).__name__}:{location}'
+        self._fp: Optional[IO[str]] = None
+
+    @staticmethod
+    def test(location: Any) -> bool:
+        return False
+
+    def put(self, data: IO[str]) -> None:
+        self._inner.put(data)
+        self._cache.invalidate(self._identity)
+
+    def append(self, data: IO[str]) -> None:
+        self._inner.append(data)
+        self._cache.invalidate(self._identity)
+
+    def get(self) -> IO[str]:
+        validate = self._cache.validate and self._has_cheap_fingerprint()
+        entry = self._cache.lookup(self._identity)
+        if entry is not None:
+            path, fingerprint = entry
+            if validate:
+                usable = self._inner.is_current(fingerprint)
+            else:
+                usable = not self._cache.validate or \
+                    self._cache.is_fresh(path)
+            if usable:
+                fp = self._open(path)
+                if fp is not None:
+                    return self._replace_fp(fp)
+
+        if validate:
+            fingerprint, data = self._inner.snapshot()
+        else:
+            fingerprint, data = '', self._inner.get()
+        path = self._cache.store(self._identity, fingerprint, data)
+        return self._replace_fp(path.open(mode='r', encoding='utf-8'))
+
+    def get_range(self, start: int, end: Optional[int] = None) -> str:
+        return self._inner.get_range(start, end)
+
+    def fingerprint(self) -> str:
+        return self._inner.fingerprint()
+
+    def is_current(self, fingerprint: str) -> bool:
+        return self._inner.is_current(fingerprint)
+
+    def close(self):
+        try:
+            if self._fp is not None:
+                self._fp.close()
+        except Exception as e:
+            logging.exception(e)
+        self._inner.close()
+
+    def _has_cheap_fingerprint(self) -> bool:
+        # The default implementations read the whole resource, which would
+        # make every validation as expensive as a cache miss.
+        Manager = type(self._inner)
+        return Manager.fingerprint is not ResourceManagerBase.fingerprint or \
+            Manager.is_current is not ResourceManagerBase.is_current
+
+    @staticmethod
+    def _open(path: Path) -> Optional[IO[str]]:
+        try:
+            return path.open(mode='r', encoding='utf-8')
+        except FileNotFoundError:
+            logger.debug(f'Cache entry {path} was evicted before use.')
+            return None
+
+    def _replace_fp(self, fp: IO[str]) -> IO[str]:
+        previous, self._fp = self._fp, fp
+        if previous is not None:
+            previous.close()
+        return proxy(fp)
@@ -1,12 +1,18 @@
-import logging
+import asyncio
 import shutil
+from collections.abc import Iterator
 from io import StringIO, TextIOBase
 from pathlib import Path
-import tempfile
-from typing import IO, Literal, Union, cast
+from typing import (AsyncIterable, Callable, IO, Iterable, Literal, Optional,
+                    Union, cast)
+from weakref import finalize
 
 from .errors import ResourceResolverError
-from .managers import ManagerRegistry
+from .managers import CachingManager, ManagerRegistry, ResourceManagerBase
+from .streams import (ChunkReader, iter_async_chunks, iter_string_chunks,
+                      spool)
+
+WriteData = Union[str, IO[str], Iterable[str], AsyncIterable[str]]
 
 
 class ResourceProxy:
@@ -14,7 +20,14 @@ class ResourceProxy:
     A proxy object for resources. The proxy object provides a consistent 
     interface for resources which is independent of the type of resource which
     it is backed by.
+
+    The manager backing a resource is only created when the resource is first
+    used, so defined but unused resources hold no open files. The manager is
+    closed by close, or when the proxy is garbage collected. If a DiskCache
+    is passed as the cache keyword argument, reads are served through it.
     """
+    __slots__ = ('_location', '_read_only', '_Manager', '_kwargs',
+                 '_instance', '_finalizer', '__weakref__')
     GET_AS_FORMATS = ['str', 'buffer', 'file_handle']
 
     def __init__(self, location: Union[str, IO[str], Path],
@@ -26,27 +39,90 @@ class ResourceProxy:
         if not Manager:
             location = repr(location)
             raise ResourceResolverError.UnsupportedProtocol(location)
-        self._manager = Manager(location, **kwargs)
+        self._Manager = Manager
+        self._kwargs = kwargs or None
+        self._instance: Optional[ResourceManagerBase] = None
+        self._finalizer: Optional[finalize] = None
+        if isinstance(location, TextIOBase):
+            # Streams are copied immediately since they may change later.
+            self._open_manager()
+
+    @property
+    def _manager(self) -> ResourceManagerBase:
+        if self._instance is None:
+            return self._open_manager()
+        return self._instance
+
+    def close(self) -> None:
+        """
+        Closes the manager backing the resource, if it has been created.
+        """
+        if self._finalizer is not None:
+            self._finalizer()
+
+    def _open_manager(self) -> ResourceManagerBase:
+        manager = self._instance = self._create_manager()
+        # The finalizer holds the manager rather than the proxy, so the
+        # manager is closed once the proxy is released.
+        self._finalizer = finalize(self, manager.close)
+        return manager
 
-    def put(self, data: Union[str, IO[str]]) -> None:
+    def _create_manager(self) -> ResourceManagerBase:
+        kwargs = dict(self._kwargs or {})
+        self._kwargs = None
+        cache = kwargs.pop('cache', None)
+        manager = self._Manager(self._location, **kwargs)
+        if cache is not None:
+            manager = CachingManager(self._location, manager, cache)
+        return manager
+
+    def put(self, data: WriteData) -> None:
         """
         Overwrites the specified resource with the supplied data.
 
-        Data supplied must be in the form of a raw string or a text stream.
+        Data supplied must be in the form of a raw string, a text stream, or
+        an iterable or async iterable of strings. Iterables are first copied
+        a chunk at a time to a temporary stream, so the resource is left
+        unchanged if producing the data fails.
         If the resource has previously been indicated to be read-only, a 
         ResourceResolverError will be thrown upon write attempts.
         """
         if self.is_read_only:
             raise ResourceResolverError.ReadOnly(self._location)
-        if not (isinstance(data, str) or isinstance(data, TextIOBase)):
-            raise ResourceResolverError.UnsupportedWriteType(data)
+        self._check_not_in_event_loop(data, 'asave')
+        self._manager.put(self._produce_stream_from_data(data))
 
-        if isinstance(data, str):
-            data = cast(str, data)
-            data = self._produce_stream_from_data(data)
+    def append(self, data: WriteData) -> None:
+        """
+        Appends the supplied data to the specified resource. Data is accepted
+        in the same forms as put.
+        """
+        if self.is_read_only:
+            raise ResourceResolverError.ReadOnly(self._location)
+        self._check_not_in_event_loop(data, 'aappend')
+        self._manager.append(self._produce_stream_from_data(data))
 
-        data = cast(IO[str], data)
-        self._manager.put(data)
+    async def aput(self, data: WriteData) -> None:
+        """
+        Overwrites the specified resource with the supplied data from within
+        a running event loop.
+
+        The write is performed in the loop's default executor. Async
+        iterables are consumed on the running loop before the resource is
+        touched.
+        """
+        if self.is_read_only:
+            raise ResourceResolverError.ReadOnly(self._location)
+        await self._write_in_executor(self._manager.put, data)
+
+    async def aappend(self, data: WriteData) -> None:
+        """
+        Appends the supplied data to the specified resource from within a
+        running event loop, in the same way as aput.
+        """
+        if self.is_read_only:
+            raise ResourceResolverError.ReadOnly(self._location)
+        await self._write_in_executor(self._manager.append, data)
 
     def get(self, as_a: str) -> Union[str, IO[str], StringIO]:
         """
@@ -71,25 +147,63 @@ class ResourceProxy:
             as_a = cast(Literal['file_handle'], as_a)
             return self._manager.get()
 
+    def get_range(self, start: int, end: Optional[int] = None) -> str:
+        """
+        Retrieves the part of the resource between the byte offsets start and
+        end (inclusive).
+        """
+        return self._manager.get_range(start, end)
+
+    def fingerprint(self) -> str:
+        """
+        Returns a string identifying the current version of the resource.
+        """
+        return self._manager.fingerprint()
+
     @property
     def is_read_only(self) -> bool:
         return self._read_only
 
-    def _produce_stream_from_data(self, data: str) -> IO[str]:
+    async def _write_in_executor(self, write: Callable[[IO[str]], None],
+                                 data: WriteData) -> None:
+        loop = asyncio.get_running_loop()
+        if isinstance(data, AsyncIterable):
+            data = iter_async_chunks(data, loop=loop)
+        stream = await loop.run_in_executor(
+            None, self._produce_stream_from_data, data)
+        await loop.run_in_executor(None, write, stream)
+
+    def _check_not_in_event_loop(self, data: WriteData,
+                                 alternative: str) -> None:
         """
-        Attempts to wrap a raw string in a buffer. If memory allocation fails 
-        then a text stream is returned.
+        Async iterables cannot be consumed synchronously from within a
+        running event loop, so the write is refused before the resource is
+        touched.
         """
+        if not isinstance(data, AsyncIterable):
+            return
         try:
-            buffer: IO[str] = StringIO(data)
-            buffer.seek(0, 0)
-        except MemoryError:
-            logging.warning('Failed to allocation memory for string. '
-                            f'String has length {len(data)}.')
-            fp = tempfile.TemporaryFile(mode="w+")
-            fp.write(data)
-            fp.seek(0, 0)
-            return fp
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        raise ResourceResolverError.AsyncWriteInEventLoop(self._location,
+                                                          alternative)
 
-        else:
-            return buffer
+    def _produce_stream_from_data(self, data: WriteData) -> IO[str]:
+        """
+        Wraps the data supplied to a write in a text stream. Strings are read
+        lazily in slices. Iterators, lists and tuples of strings are spooled
+        to a temporary stream, so that invalid chunks or errors raised by a
+        producer are surfaced before the resource is modified. Other
+        iterables, such as sets, mappings or data frames, have no meaningful
+        order of string chunks and are refused.
+        """
+        if isinstance(data, str):
+            return cast(IO[str], ChunkReader(iter_string_chunks(data)))
+        if isinstance(data, TextIOBase):
+            return cast(IO[str], data)
+        if isinstance(data, AsyncIterable):
+            return spool(iter_async_chunks(data))
+        if isinstance(data, (Iterator, list, tuple)):
+            return spool(data)
+        raise ResourceResolverError.UnsupportedWriteType(data)
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
 from pathlib import Path
-from typing import Dict, IO, Literal, Optional, Union, overload
+from typing import (Callable, Dict, IO, List, Literal, Optional,
+                    Sequence, Union, overload)
 
+from .derived import (Derivation, default_state_location,
+                      run_in_dependency_order)
 from .errors import ResourceResolverError
-from .proxy import ResourceProxy
+from .proxy import ResourceProxy, WriteData
 
 instance = None
 
@@ -19,10 +24,19 @@ class ResourceResolver:
     - IO[str]: Any object of type IO which returns a string (a file like object).
     - Path: Any subclass of pathlib.Path.
     - file url: Matches ^file:///.* .
+    - http(s) url: Matches ^https?://.* . These resources are read-only.
+    - sqlite url: Matches ^sqlite://.*#.* . The part after the '#' names a
+      row of the SQLite database at the path before it.
+
+    Resources can also be derived from other resources with derive.
     """
 
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None):
         self._resource_map: Dict[str, ResourceProxy] = {}
+        self._derivations: Dict[str, Derivation] = {}
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._io_lock = threading.RLock()
 
     @staticmethod
     def get_instance() -> ResourceResolver:
@@ -32,8 +46,11 @@ class ResourceResolver:
         return instance
 
     def clear(self):
-        """Removes all resources from the resolver."""
+        """Removes all resources from the resolver and closes them."""
+        for resource_io in self._resource_map.values():
+            resource_io.close()
         self._resource_map.clear()
+        self._derivations.clear()
 
     def has(self, key: str) -> bool:
         """Returns true if the key is defined in the resolver."""
@@ -60,9 +77,24 @@ class ResourceResolver:
 
         if not key in self._resource_map:
             raise ResourceResolverError.UndefinedResource(key=key)
+        if key in self._derivations:
+            self._refresh(key)
         proxy = self._resource_map[key]
         return proxy.get(as_a=as_a)
 
+    def get_range(self, key: str, start: int,
+                  end: Optional[int] = None) -> str:
+        """
+        Return the part of the resource between the byte offsets start and
+        end (inclusive). Managers which support partial reads, such as the
+        HTTP manager, avoid retrieving the whole resource.
+        """
+        if not key in self._resource_map:
+            raise ResourceResolverError.UndefinedResource(key=key)
+        if key in self._derivations:
+            self._refresh(key)
+        return self._resource_map[key].get_range(start, end)
+
     def define(self, key: str,
                location: Optional[Union[str, IO[str], Path]] = None,
                overwrite=False,
@@ -80,28 +112,218 @@ class ResourceResolver:
         If read_only is passed as true, any attempts 
         to write to the resource will throw an error.
 
+        Except for streams, the resource is not opened until it is first used.
+        A resource replaced using overwrite is closed.
+
         :returns: None
         """
         if key in self._resource_map and not overwrite:
             raise ResourceResolverError.DuplicateKey(key=key)
         if not location:
             location = f'tmp://{key}'
-        self._resource_map[key] = self._create_resource_io(location,
-                                                           read_only,
-                                                           **kwargs)
+        resource_io = self._create_resource_io(location, read_only, **kwargs)
+        previous = self._resource_map.get(key)
+        self._resource_map[key] = resource_io
+        if previous is not None:
+            previous.close()
+        self._derivations.pop(key, None)
+
+    def derive(self, key: str,
+               inputs: Sequence[str],
+               fn: Callable[..., WriteData],
+               location: Optional[Union[str, Path]] = None,
+               state_location: Optional[Union[str, Path]] = None,
+               version: Optional[str] = None,
+               overwrite=False,
+               **kwargs) -> None:
+        """Defines a resource computed from other resources.
+
+        The resource is computed on first retrieval, and recomputed only when
+        the fingerprint of one of its inputs, or of the stored result,
+        changes. Derived inputs which are out of date and do not depend on
+        each other are recomputed in parallel.
+
+        :param key: The name of the resource which is being defined.
+        :param inputs: The keys of the resources the value is computed from.
+        These must already be defined.
+        :param fn: A pure function which is called with the contents of each
+        input as a string and returns data in any form accepted by save.
+        :param location: The location at which the result is stored. If not
+        supplied, an in-memory buffer is used.
+        :param state_location: A location at which to record the fingerprints
+        the result was computed from, so that later processes can reuse it.
+        Defaults to a sidecar file for file locations.
+        :param version: An identifier for the logic of fn. Changes to the code,
+        constants, defaults and closure of fn are detected, but changes to
+        code it calls are not; change the version to force recomputation.
+        :param overwrite: Required to be true if defining a resource with an
+        existing key.
+
+        :returns: None
+        """
+        for input_key in inputs:
+            if not input_key in self._resource_map:
+                raise ResourceResolverError.UndefinedResource(key=input_key)
+            if self._depends_on(input_key, key):
+                raise ResourceResolverError.CyclicDerivation(key=key)
+
+        self.define(key, location, overwrite=overwrite, **kwargs)
+        if state_location is None:
+            state_location = default_state_location(location)
+        state_proxy = None
+        if state_location is not None:
+            state_proxy = self._create_resource_io(state_location, False)
+        self._derivations[key] = Derivation(key, inputs, fn, state_proxy,
+                                            version=version)
+
+    def fingerprint(self, key: str) -> str:
+        """
+        Returns a string which changes whenever the data stored in the given
+        resource changes.
+        """
+        if not key in self._resource_map:
+            raise ResourceResolverError.UndefinedResource(key=key)
+        if key in self._derivations:
+            self._refresh(key)
+        return self._current_fingerprint(key)
 
-    def save(self, key: str, data: Union[str, IO[str]]) -> None:
+    def save(self, key: str, data: WriteData) -> None:
         """
         Saves the string or string buffer argument passed
-        to the given resource.
+        to the given resource. Iterables and async iterables of strings, such
+        as generators, are streamed to the resource a chunk at a time.
         """
         if not key in self._resource_map:
             raise ResourceResolverError.UndefinedResource(key=key)
+        if key in self._derivations:
+            raise ResourceResolverError.ReadOnly(key)
 
         resource_io = self._resource_map[key]
 
         resource_io.put(data)
 
+    def append(self, key: str, data: WriteData) -> None:
+        """
+        Appends the data passed to the given resource.
+        """
+        if not key in self._resource_map:
+            raise ResourceResolverError.UndefinedResource(key=key)
+        if key in self._derivations:
+            raise ResourceResolverError.ReadOnly(key)
+
+        resource_io = self._resource_map[key]
+
+        resource_io.append(data)
+
+    async def asave(self, key: str, data: WriteData) -> None:
+        """
+        Saves the data to the given resource without blocking the running
+        event loop.
+        """
+        if not key in self._resource_map:
+            raise ResourceResolverError.UndefinedResource(key=key)
+        if key in self._derivations:
+            raise ResourceResolverError.ReadOnly(key)
+
+        resource_io = self._resource_map[key]
+
+        await resource_io.aput(data)
+
+    async def aappend(self, key: str, data: WriteData) -> None:
+        """
+        Appends the data to the given resource without blocking the running
+        event loop.
+        """
+        if not key in self._resource_map:
+            raise ResourceResolverError.UndefinedResource(key=key)
+        if key in self._derivations:
+            raise ResourceResolverError.ReadOnly(key)
+
+        resource_io = self._resource_map[key]
+
+        await resource_io.aappend(data)
+
+    def _derived_closure(self, key: str) -> Dict[str, List[str]]:
+        """
+        Maps key and every derived resource it depends on to the derived
+        resources among their inputs.
+        """
+        closure: Dict[str, List[str]] = {}
+        stack = [key]
+        while stack:
+            current = stack.pop()
+            if current in closure or current not in self._derivations:
+                continue
+            inputs = self._derivations[current].inputs
+            closure[current] = [i for i in inputs if i in self._derivations]
+            stack.extend(closure[current])
+        return closure
+
+    def _depends_on(self, key: str, dependency: str) -> bool:
+        """
+        Returns true if key is, or is derived directly or indirectly from,
+        dependency.
+        """
+        stack = [key]
+        seen = set()
+        while stack:
+            current = stack.pop()
+            if current == dependency:
+                return True
+            if current in seen or current not in self._derivations:
+                continue
+            seen.add(current)
+            stack.extend(self._derivations[current].inputs)
+        return False
+
+    def _refresh(self, key: str) -> None:
+        """
+        Recomputes key and any derived resources it depends on which are out
+        of date.
+        """
+        run_in_dependency_order(self._derived_closure(key),
+                                self._refresh_derivation,
+                                self._get_executor())
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._io_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix='resource-resolver')
+            return self._executor
+
+    def _refresh_derivation(self, key: str) -> None:
+        derivation = self._derivations[key]
+        proxy = self._resource_map[key]
+        with derivation.lock:
+            with self._io_lock:
+                fingerprints = [self._current_fingerprint(i)
+                                for i in derivation.inputs]
+                combined = derivation.combine(fingerprints)
+                state = derivation.state
+                if (state.get('inputs') == combined and
+                        state.get('output') == proxy.fingerprint()):
+                    return
+                values = [self._resource_map[i].get(as_a='str')
+                          for i in derivation.inputs]
+
+            result = derivation.fn(*values)
+
+            with self._io_lock:
+                proxy.put(result)
+                derivation.state = {'inputs': combined,
+                                    'output': proxy.fingerprint()}
+
+    def _current_fingerprint(self, key: str) -> str:
+        """
+        Returns the fingerprint of a resource without refreshing it. For a
+        derived resource this is the fingerprint its value was computed from.
+        """
+        if key in self._derivations:
+            return self._derivations[key].state.get('inputs', '')
+        return self._resource_map[key].fingerprint()
+
     def _create_resource_io(self, location: Union[str, IO[str], Path],
                             read_only: bool,
                             **kwargs) -> ResourceProxy:
@@ -0,0 +1,131 @@
+"""
+Adapters which present incrementally produced data as text streams.
+"""
+from __future__ import annotations
+
+import asyncio
+import io
+import shutil
+import tempfile
+from io import TextIOBase
+from typing import IO, AsyncIterable, Iterable, Iterator, Optional, cast
+
+from .errors import ResourceResolverError
+
+CHUNK_SIZE = 64 * 1024
+SPOOL_SIZE = 8 * 1024 ** 2
+
+
+class ChunkReader(TextIOBase):
+    """
+    A read-only text stream over an iterable of string chunks.
+
+    Chunks are pulled from the iterable only as they are read, so at most one
+    chunk is held in memory at a time. The stream can be rewound to the start
+    only while nothing has been read from it.
+    """
+
+    def __init__(self, chunks: Iterable[str]):
+        super().__init__()
+        self._chunks: Iterator[str] = iter(chunks)
+        self._buffer = ''
+        self._offset = 0
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        if offset == 0 and whence == 0 and self._position == 0:
+            return 0
+        raise io.UnsupportedOperation('ChunkReader is not seekable.')
+
+    def read(self, size: Optional[int] = -1) -> str:
+        if size is None or size < 0:
+            parts = [self._buffer[self._offset:]]
+            parts.extend(self._checked(chunk) for chunk in self._chunks)
+            data = ''.join(parts)
+            self._buffer, self._offset = '', 0
+        else:
+            while len(self._buffer) - self._offset < size:
+                chunk = next(self._chunks, None)
+                if chunk is None:
+                    break
+                self._buffer = self._buffer[self._offset:] + \
+                    self._checked(chunk)
+                self._offset = 0
+            data = self._buffer[self._offset:self._offset + size]
+            self._offset += len(data)
+        self._position += len(data)
+        return data
+
+    @staticmethod
+    def _checked(chunk: str) -> str:
+        if not isinstance(chunk, str):
+            raise ResourceResolverError.UnsupportedWriteType(chunk)
+        return chunk
+
+
+def spool(chunks: Iterable[str], max_size: int = SPOOL_SIZE) -> IO[str]:
+    """
+    Copies an iterable of string chunks into a temporary stream, which is
+    held in memory until it grows beyond max_size characters and on disk
+    thereafter. The returned stream is positioned at the start.
+    """
+    fp = tempfile.SpooledTemporaryFile(max_size=max_size, mode='w+',
+                                       encoding='utf-8')
+    try:
+        shutil.copyfileobj(ChunkReader(chunks), fp, CHUNK_SIZE)
+        fp.seek(0, 0)
+    except BaseException:
+        fp.close()
+        raise
+    return cast(IO[str], fp)
+
+
+def iter_string_chunks(data: str, size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Yields successive slices of a string."""
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def iter_async_chunks(chunks: AsyncIterable[str],
+                      loop: Optional[asyncio.AbstractEventLoop] = None
+                      ) -> Iterator[str]:
+    """
+    Yields the chunks of an async iterable from synchronous code.
+
+    If loop is given, it must be running in another thread and each chunk is
+    awaited on it. Otherwise the iterable is driven by a private event loop.
+    """
+    iterator = chunks.__aiter__()
+    if loop is not None:
+        def fetch():
+            return asyncio.run_coroutine_threadsafe(
+                iterator.__anext__(), loop).result()
+    else:
+        private_loop = asyncio.new_event_loop()
+
+        def fetch():
+            return private_loop.run_until_complete(iterator.__anext__())
+    try:
+        while True:
+            try:
+                yield fetch()
+            except StopAsyncIteration:
+                return
+    finally:
+        aclose = getattr(iterator, 'aclose', None)
+        if loop is not None:
+            if aclose is not None:
+                asyncio.run_coroutine_threadsafe(aclose(), loop).result()
+        else:
+            if aclose is not None:
+                private_loop.run_until_complete(aclose())
+            private_loop.close()
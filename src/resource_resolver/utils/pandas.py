@@ -1,18 +1,227 @@
 """
 Pandas extensions for resource resolver.
 """
+from __future__ import annotations
+
+import hashlib
 import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import cast
+from typing import Any, List, Optional, Tuple, Union, cast
 
 import pandas as pd
 import pyarrow as pa
+import pyarrow.feather as feather
 import pyarrow.parquet as pq
 
 from ..core import get_resource_resolver
+from ..core.managers import use_default_permissions
 
 logger = logging.getLogger(__name__)
 
+_dataframe_cache: Optional[DataFrameCache] = None
+
+
+class DataFrameCache:
+    """
+    Memoizes parsed dataframes by resource fingerprint.
+
+    Entries are held in memory up to a budget of max_bytes and evicted in
+    least recently used order. If a spill directory is supplied, every entry
+    is also written there as an Arrow IPC file so that later loads, including
+    those made by other processes sharing the directory, skip parsing. The
+    spill directory is held to max_spill_bytes by removing the least recently
+    used files.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024 ** 2,
+                 spill_dir: Optional[Union[str, Path]] = None,
+                 max_spill_bytes: int = 4 * 1024 ** 3):
+        self._max_bytes = max_bytes
+        self._max_spill_bytes = max_spill_bytes
+        self._spill_dir = Path(spill_dir) if spill_dir is not None else None
+        self._entries: OrderedDict[str, Tuple[pd.DataFrame, int]] = \
+            OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        if self._spill_dir is not None:
+            self._spill_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(*parts: Any, **kwargs: Any) -> str:
+        """
+        Produces a cache key from a resource fingerprint and the keyword
+        arguments used to read it.
+        """
+        material = _faithful_repr((parts, sorted(kwargs.items())))
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    @property
+    def size(self) -> int:
+        """The number of bytes currently held in memory."""
+        return self._size
+
+    def get(self, cache_key: str) -> Optional[pd.DataFrame]:
+        """
+        Returns a copy of the cached dataframe, or None if it is not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                self._entries.move_to_end(cache_key)
+                return entry[0].copy()
+
+        df = self._read_spilled(cache_key)
+        if df is None:
+            return None
+        self._remember(cache_key, df)
+        return df.copy()
+
+    def put(self, cache_key: str, df: pd.DataFrame) -> None:
+        """
+        Stores a copy of the dataframe under the given key.
+        """
+        df = df.copy()
+        self._remember(cache_key, df)
+        self._spill(cache_key, df)
+
+    def clear(self) -> None:
+        """Removes all in-memory entries. Spilled files are left in place."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remember(self, cache_key: str, df: pd.DataFrame) -> None:
+        nbytes = int(df.memory_usage(deep=True).sum())
+        if nbytes > self._max_bytes:
+            logger.debug(f'Dataframe of {nbytes} bytes exceeds the cache '
+                         f'budget of {self._max_bytes} bytes.')
+            return
+        with self._lock:
+            previous = self._entries.pop(cache_key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[cache_key] = (df, nbytes)
+            self._size += nbytes
+            while self._size > self._max_bytes:
+                evicted_key, (_, evicted_bytes) = \
+                    self._entries.popitem(last=False)
+                self._size -= evicted_bytes
+                logger.debug(f'Evicted dataframe {evicted_key} from cache.')
+
+    def _spill_path(self, cache_key: str) -> Optional[Path]:
+        if self._spill_dir is None:
+            return None
+        return self._spill_dir / f'{cache_key}.arrow'
+
+    def _spill(self, cache_key: str, df: pd.DataFrame) -> None:
+        path = self._spill_path(cache_key)
+        if path is None or path.exists():
+            return
+        try:
+            _write_feather(path, df)
+        except Exception as e:
+            logger.warning(f'Failed to spill dataframe {cache_key}: {e}')
+            return
+        self._evict_spilled(keep=path)
+
+    def _evict_spilled(self, keep: Path) -> None:
+        spill_dir = cast(Path, self._spill_dir)
+        entries = []
+        for path in spill_dir.glob('*.arrow'):
+            if path == keep:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = keep.stat().st_size + sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self._max_spill_bytes:
+                break
+            logger.debug(f'Evicting spilled dataframe {path}.')
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def _read_spilled(self, cache_key: str) -> Optional[pd.DataFrame]:
+        path = self._spill_path(cache_key)
+        if path is None or not path.exists():
+            return None
+        try:
+            table = _read_feather(path)
+            os.utime(path)
+        except Exception as e:
+            logger.warning(f'Failed to read spilled dataframe {path}: {e}')
+            return None
+        logger.debug(f'Loaded dataframe {cache_key} from {path}.')
+        return cast(pd.DataFrame, table.to_pandas())
+
+
+def configure_dataframe_cache(max_bytes: int = 512 * 1024 ** 2,
+                              spill_dir: Optional[Union[str, Path]] = None,
+                              max_spill_bytes: int = 4 * 1024 ** 3
+                              ) -> DataFrameCache:
+    """
+    Enables memoization of the dataframe readers in this module.
+
+    Once enabled, repeated reads of an unchanged resource with the same
+    arguments return a copy of the previously parsed dataframe.
+    """
+    global _dataframe_cache
+    _dataframe_cache = DataFrameCache(max_bytes=max_bytes,
+                                      spill_dir=spill_dir,
+                                      max_spill_bytes=max_spill_bytes)
+    return _dataframe_cache
+
+
+def disable_dataframe_cache() -> None:
+    """Disables memoization of the dataframe readers in this module."""
+    global _dataframe_cache
+    _dataframe_cache = None
+
+
+def get_dataframe_cache() -> Optional[DataFrameCache]:
+    """Returns the active dataframe cache, if one has been configured."""
+    return _dataframe_cache
+
+
+def _faithful_repr(value: Any) -> str:
+    """
+    Returns the repr of a value, with array-likes such as numpy arrays and
+    pandas Index objects, whose repr is abbreviated when they are large,
+    represented by their full contents.
+    """
+    if isinstance(value, (list, tuple)):
+        items = ', '.join(_faithful_repr(item) for item in value)
+        return f'{type(value).__name__}({items})'
+    if isinstance(value, dict):
+        items = ', '.join(f'{_faithful_repr(k)}: {_faithful_repr(v)}'
+                          for k, v in value.items())
+        return f'{{{items}}}'
+    if hasattr(value, 'tolist'):
+        return f'{type(value).__name__}({value.tolist()!r})'
+    return repr(value)
+
+
+def _fingerprint_path(path: Path) -> str:
+    """
+    Fingerprints a file or dataset directory by the size and modification
+    time of every file it contains.
+    """
+    if not path.is_dir():
+        stat = path.stat()
+        return f'{stat.st_size}:{stat.st_mtime_ns}'
+    digest = hashlib.sha256()
+    for child in sorted(p for p in path.rglob('*') if p.is_file()):
+        stat = child.stat()
+        digest.update(f'{child.relative_to(path)}:{stat.st_size}:'
+                      f'{stat.st_mtime_ns};'.encode('utf-8'))
+    return digest.hexdigest()
+
 
 def get_pq_resource_as_dataframe(key: str, filters=[], **kwargs):
     resolver = get_resource_resolver()
@@ -20,8 +229,22 @@ def get_pq_resource_as_dataframe(key: str, filters=[], **kwargs):
     logger.debug(f'Getting path for resource {key}')
     resource_path = Path(resolver.get(key, as_a='str'))
 
+    cache = _dataframe_cache
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.make_key('parquet', str(resource_path),
+                                   _fingerprint_path(resource_path),
+                                   filters=filters, **kwargs)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.debug(f'Using cached dataframe for resource {key}.')
+            return cached
+
     df = cast(pd.DataFrame, pd.read_parquet(resource_path, engine='pyarrow',
                                             filters=filters, **kwargs))
+    if (cache is not None and cache_key is not None and
+            isinstance(df, pd.DataFrame)):
+        cache.put(cache_key, df)
     if hasattr(df, 'columns'):
         logger.debug(f'Dataframe from {key} has columns {list(df.columns)}.')
     if hasattr(df, 'size'):
@@ -50,11 +273,27 @@ def append_dataframe_pq(key: str,
 def get_csv_resource_as_dataframe(key: str, encoding='utf-8', **kwargs) -> pd.DataFrame:
     resolver = get_resource_resolver()
 
+    cache = _dataframe_cache
+    if kwargs.get('chunksize') or kwargs.get('iterator'):
+        # Readers are consumed incrementally and cannot be memoized.
+        cache = None
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.make_key('csv', resolver.fingerprint(key),
+                                   encoding=encoding, **kwargs)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.debug(f'Using cached dataframe for resource {key}.')
+            return cached
+
     logger.debug(f'Getting file handle for resource {key}')
     resource = resolver.get(key, as_a='file_handle')
 
     df = cast(pd.DataFrame, pd.read_csv(
         resource, engine='python', encoding=encoding, **kwargs))
+    if (cache is not None and cache_key is not None and
+            isinstance(df, pd.DataFrame)):
+        cache.put(cache_key, df)
     if hasattr(df, 'columns'):
         logger.debug(f'Dataframe from {key} has columns {list(df.columns)}.')
     if hasattr(df, 'size'):
@@ -96,3 +335,71 @@ def append_dataframe_csv(key: str, df: pd.DataFrame,
     logger.debug(f"Wrote {diff} bytes to resource {key}.")
 
     return diff
+
+
+def _write_feather(path: Path, df: pd.DataFrame,
+                   compression: Optional[str] = None) -> None:
+    """
+    Writes a dataframe to an Arrow IPC file. The file is written alongside
+    the destination and then moved into place, so processes which have the
+    previous file memory mapped are unaffected.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    os.close(fd)
+    try:
+        feather.write_feather(df, tmp_name,
+                              compression=compression or 'uncompressed',
+                              version=2)
+        use_default_permissions(tmp_name)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _read_feather(path: Path, columns: Optional[List[str]] = None,
+                  memory_map: bool = True) -> pa.Table:
+    """
+    Reads an Arrow IPC file. When memory mapped, uncompressed columns
+    reference the mapped pages rather than being copied.
+    """
+    return feather.read_table(str(path), columns=columns,
+                              memory_map=memory_map)
+
+
+def get_feather_resource_as_table(key: str,
+                                  columns: Optional[List[str]] = None,
+                                  memory_map: bool = True) -> pa.Table:
+    resolver = get_resource_resolver()
+
+    logger.debug(f'Getting path for resource {key}')
+    resource_path = Path(resolver.get(key, as_a='str'))
+
+    table = _read_feather(resource_path, columns=columns,
+                          memory_map=memory_map)
+    logger.debug(f'Table from {key} has columns {table.column_names}.')
+    return table
+
+
+def get_feather_resource_as_dataframe(key: str,
+                                      columns: Optional[List[str]] = None,
+                                      memory_map: bool = True,
+                                      **kwargs) -> pd.DataFrame:
+    table = get_feather_resource_as_table(key, columns=columns,
+                                          memory_map=memory_map)
+
+    df = cast(pd.DataFrame, table.to_pandas(**kwargs))
+    if hasattr(df, 'size'):
+        logger.debug(f'Dataframe from {key} has size {df.size}.')
+    return df
+
+
+def save_dataframe_feather(key: str, df: pd.DataFrame,
+                           compression: Optional[str] = None) -> None:
+    resolver = get_resource_resolver()
+
+    logger.debug(f'Getting path for resource {key}')
+    resource_path = Path(resolver.get(key, as_a='str'))
+
+    _write_feather(resource_path, df, compression=compression)
+    logger.debug(f'Wrote {df.size} values to resource {key}.')
@@ -0,0 +1,178 @@
+import pathlib
+import tempfile
+import threading
+import unittest
+
+from resource_resolver import ResourceResolver, ResourceResolverError
+
+
+class DerivedResourceTestSuite(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.raw_path = pathlib.Path(self.tmp_dir.name) / 'raw.csv'
+        self.raw_path.write_text('a, b ,c\n')
+        self.clean_path = pathlib.Path(self.tmp_dir.name) / 'clean.csv'
+
+        self.calls = []
+        self.test_resolver = ResourceResolver()
+        self.test_resolver.define('raw', self.raw_path)
+
+    def tearDown(self):
+        self.test_resolver.clear()
+        self.tmp_dir.cleanup()
+
+    def clean(self, raw):
+        self.calls.append(raw)
+        return ','.join(field.strip(' ') for field in raw.split(','))
+
+    def test_derived_value_is_computed_on_first_get(self):
+        self.test_resolver.derive('clean', inputs=['raw'], fn=self.clean)
+
+        self.assertEqual(self.calls, [])
+        self.assertEqual(self.test_resolver.get('clean'), 'a,b,c\n')
+        self.assertEqual(len(self.calls), 1)
+
+    def test_derived_value_is_not_recomputed_when_inputs_are_unchanged(self):
+        self.test_resolver.derive('clean', inputs=['raw'], fn=self.clean)
+
+        self.test_resolver.get('clean')
+        self.test_resolver.get('clean')
+
+        self.assertEqual(len(self.calls), 1)
+
+    def test_derived_value_is_recomputed_after_an_input_is_saved(self):
+        self.test_resolver.derive('clean', inputs=['raw'], fn=self.clean)
+        self.test_resolver.get('clean')
+
+        self.test_resolver.save('raw', 'x , y\n')
+
+        self.assertEqual(self.test_resolver.get('clean'), 'x,y\n')
+        self.assertEqual(len(self.calls), 2)
+
+    def test_derived_value_is_recomputed_after_an_external_modification(self):
+        self.test_resolver.derive('clean', inputs=['raw'], fn=self.clean)
+        self.test_resolver.get('clean')
+
+        self.raw_path.write_text('p , q , r , s\n')
+
+        self.assertEqual(self.test_resolver.get('clean'), 'p,q,r,s\n')
+
+    def test_chained_derived_values_are_recomputed(self):
+        self.test_resolver.derive('clean', inputs=['raw'], fn=self.clean)
+        self.test_resolver.derive('upper', inputs=['clean'], fn=str.upper)
+        self.assertEqual(self.test_resolver.get('upper'), 'A,B,C\n')
+
+        self.test_resolver.append('raw', 'd , e\n')
+
+        self.assertEqual(self.test_resolver.get('upper'), 'A,B,C\nD,E\n')
+
+    def test_derived_value_is_reused_across_resolvers(self):
+        self.test_resolver.derive('clean', inputs=['raw'], fn=self.clean,
+                                  location=self.clean_path)
+        self.test_resolver.get('clean')
+
+        other_resolver = ResourceResolver()
+        other_resolver.define('raw', self.raw_path)
+        other_resolver.derive('clean', inputs=['raw'], fn=self.clean,
+                              location=self.clean_path)
+
+        self.assertEqual(other_resolver.get('clean'), 'a,b,c\n')
+        self.assertEqual(len(self.calls), 1)
+        other_resolver.clear()
+
+    def test_changed_constants_in_fn_cause_recomputation(self):
+        self.test_resolver.derive('joined', inputs=['raw'],
+                                  fn=lambda s: s.replace(',', ';'),
+                                  location=self.clean_path)
+        self.assertEqual(self.test_resolver.get('joined'), 'a; b ;c\n')
+
+        other_resolver = ResourceResolver()
+        other_resolver.define('raw', self.raw_path)
+        other_resolver.derive('joined', inputs=['raw'],
+                              fn=lambda s: s.replace(',', '|'),
+                              location=self.clean_path)
+
+        self.assertEqual(other_resolver.get('joined'), 'a| b |c\n')
+        other_resolver.clear()
+
+    def test_changed_closure_values_cause_recomputation(self):
+        def make_fn(separator):
+            return lambda s: s.replace(',', separator)
+
+        self.test_resolver.derive('joined', inputs=['raw'], fn=make_fn(';'))
+        self.test_resolver.get('joined')
+        self.test_resolver.derive('joined', inputs=['raw'], fn=make_fn('|'),
+                                  overwrite=True)
+
+        self.assertEqual(self.test_resolver.get('joined'), 'a| b |c\n')
+
+    def test_changed_version_causes_recomputation(self):
+        self.test_resolver.derive('clean', inputs=['raw'], fn=self.clean,
+                                  location=self.clean_path, version='1')
+        self.test_resolver.get('clean')
+
+        other_resolver = ResourceResolver()
+        other_resolver.define('raw', self.raw_path)
+        other_resolver.derive('clean', inputs=['raw'], fn=self.clean,
+                              location=self.clean_path, version='2')
+        other_resolver.get('clean')
+
+        self.assertEqual(len(self.calls), 2)
+        other_resolver.clear()
+
+    def test_refreshes_reuse_worker_threads(self):
+        self.test_resolver.derive('left', inputs=['raw'], fn=self.clean)
+        self.test_resolver.derive('right', inputs=['raw'], fn=self.clean)
+        self.test_resolver.derive('both', inputs=['left', 'right'],
+                                  fn=lambda left, right: left + right)
+        self.test_resolver.get('both')
+        threads = threading.active_count()
+
+        for i in range(20):
+            self.test_resolver.save('raw', f'{i}\n')
+            self.test_resolver.get('both')
+
+        self.assertLessEqual(threading.active_count(), threads)
+
+    def test_independent_branches_are_computed_in_parallel(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wait_for_other_branch(raw):
+            barrier.wait()
+            return raw
+
+        self.test_resolver.derive('left', inputs=['raw'],
+                                  fn=wait_for_other_branch)
+        self.test_resolver.derive('right', inputs=['raw'],
+                                  fn=wait_for_other_branch)
+        self.test_resolver.derive('both', inputs=['left', 'right'],
+                                  fn=lambda left, right: left + right)
+
+        self.assertEqual(self.test_resolver.get('both'), 'a, b ,c\n' * 2)
+
+    def test_derived_values_can_be_generators_of_chunks(self):
+        self.test_resolver.derive('lines', inputs=['raw'],
+                                  fn=lambda raw: (c for c in raw.split(',')))
+
+        self.assertEqual(self.test_resolver.get('lines'), 'a b c\n')
+
+    def test_saving_to_a_derived_resource_throws_an_error(self):
+        self.test_resolver.derive('clean', inputs=['raw'], fn=self.clean)
+
+        with self.assertRaises(ResourceResolverError):
+            self.test_resolver.save('clean', 'abc')
+
+    def test_deriving_from_an_undefined_resource_throws_an_error(self):
+        with self.assertRaises(ResourceResolverError):
+            self.test_resolver.derive('clean', inputs=['nope'], fn=self.clean)
+
+    def test_cyclic_derivation_throws_an_error(self):
+        self.test_resolver.derive('clean', inputs=['raw'], fn=self.clean)
+
+        with self.assertRaises(ResourceResolverError):
+            self.test_resolver.derive('raw', inputs=['clean'], fn=self.clean,
+                                      overwrite=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
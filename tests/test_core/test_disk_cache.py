@@ -0,0 +1,228 @@
+import io
+import os
+import pathlib
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, IO
+
+from resource_resolver import ResourceResolver
+from resource_resolver.core.managers import (DiskCache, HttpConnectionPool,
+                                             ResourceManagerBase)
+
+SOURCES: Dict[str, Dict[str, Any]] = {}
+
+
+class CountingManager(ResourceManagerBase):
+    """
+    Stands in for a slow manager by counting how often its data is fetched.
+    """
+
+    def __init__(self, location: str):
+        super().__init__(location)
+        self._source = SOURCES[location]
+
+    @staticmethod
+    def test(location: Any) -> bool:
+        return isinstance(location, str) and location.startswith('counting://')
+
+    def put(self, data: IO[str]) -> None:
+        data.seek(0, 0)
+        self._source['data'] = data.read()
+        self._source['version'] += 1
+
+    def append(self, data: IO[str]) -> None:
+        data.seek(0, 0)
+        self._source['data'] += data.read()
+        self._source['version'] += 1
+
+    def get(self) -> IO[str]:
+        self._source['fetches'] += 1
+        return io.StringIO(self._source['data'])
+
+    def fingerprint(self) -> str:
+        return str(self._source['version'])
+
+    def close(self):
+        ...
+
+
+class UnversionedManager(CountingManager):
+    """
+    A counting manager which relies on the default fingerprint, so changes
+    can only be detected by fetching the data.
+    """
+    fingerprint = ResourceManagerBase.fingerprint
+
+    @staticmethod
+    def test(location: Any) -> bool:
+        return isinstance(location, str) and \
+            location.startswith('unversioned://')
+
+
+class DiskCacheTestSuite(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = pathlib.Path(self.tmp_dir.name)
+        self.cache = DiskCache(self.cache_dir)
+        self.location = 'counting://source'
+        SOURCES[self.location] = {'data': 'abc', 'version': 0, 'fetches': 0}
+        self.test_resolver = ResourceResolver()
+        self.test_resolver.define('slow', self.location, cache=self.cache)
+
+    def tearDown(self):
+        self.test_resolver.clear()
+        self.tmp_dir.cleanup()
+
+    @property
+    def fetches(self):
+        return SOURCES[self.location]['fetches']
+
+    def test_repeated_reads_are_served_from_the_cache(self):
+        self.assertEqual(self.test_resolver.get('slow'), 'abc')
+        self.assertEqual(self.test_resolver.get('slow'), 'abc')
+
+        self.assertEqual(self.fetches, 1)
+
+    def test_cache_is_shared_by_resolvers_using_the_same_directory(self):
+        self.test_resolver.get('slow')
+        other_resolver = ResourceResolver()
+        other_resolver.define('slow', self.location,
+                              cache=DiskCache(self.cache_dir))
+
+        self.assertEqual(other_resolver.get('slow'), 'abc')
+        self.assertEqual(self.fetches, 1)
+
+    def test_changed_resource_is_fetched_again(self):
+        self.test_resolver.get('slow')
+        SOURCES[self.location].update(data='def', version=1)
+
+        self.assertEqual(self.test_resolver.get('slow'), 'def')
+        self.assertEqual(self.fetches, 2)
+        self.assertEqual(len(list(self.cache_dir.glob('*.cache'))), 1)
+
+    def test_saving_invalidates_the_cached_copy(self):
+        self.test_resolver.get('slow')
+        self.test_resolver.save('slow', 'xyz')
+
+        self.assertEqual(self.test_resolver.get('slow'), 'xyz')
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = DiskCache(self.cache_dir / 'small', max_bytes=6)
+        for name in ('a', 'b', 'c'):
+            location = f'counting://{name}'
+            SOURCES[location] = {'data': name * 3, 'version': 0, 'fetches': 0}
+            self.test_resolver.define(name, location, cache=cache)
+            self.test_resolver.get(name)
+
+        entries = list((self.cache_dir / 'small').glob('*.cache'))
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(self.test_resolver.get('c'), 'ccc')
+        self.assertEqual(SOURCES['counting://c']['fetches'], 1)
+
+    @unittest.skipIf(os.name == 'nt', 'requires POSIX permissions')
+    def test_entries_are_created_with_the_default_permissions(self):
+        self.test_resolver.get('slow')
+        umask = os.umask(0)
+        os.umask(umask)
+
+        for path in self.cache_dir.iterdir():
+            self.assertEqual(path.stat().st_mode & 0o777, 0o666 & ~umask)
+
+    def test_unversioned_resource_is_not_fetched_to_validate_reads(self):
+        location = 'unversioned://source'
+        SOURCES[location] = {'data': 'abc', 'version': 0, 'fetches': 0}
+        self.test_resolver.define('plain', location, cache=self.cache)
+        for _ in range(5):
+            self.assertEqual(self.test_resolver.get('plain'), 'abc')
+
+        self.assertEqual(SOURCES[location]['fetches'], 1)
+
+    def test_unversioned_resource_is_fetched_again_once_stale(self):
+        location = 'unversioned://source'
+        SOURCES[location] = {'data': 'abc', 'version': 0, 'fetches': 0}
+        cache = DiskCache(self.cache_dir, max_age=0)
+        self.test_resolver.define('plain', location, cache=cache)
+        self.test_resolver.get('plain')
+        SOURCES[location]['data'] = 'def'
+
+        self.assertEqual(self.test_resolver.get('plain'), 'def')
+        self.assertEqual(SOURCES[location]['fetches'], 2)
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = self.server.body.encode('utf-8')  # type: ignore
+        etag = f'"{len(body)}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.server.statuses.append(304)  # type: ignore
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.server.statuses.append(200)  # type: ignore
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HttpDiskCacheTestSuite(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = pathlib.Path(self.tmp_dir.name)
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), ETagHandler)
+        self.server.body = 'x' * 1000  # type: ignore
+        self.server.statuses = []  # type: ignore
+        threading.Thread(target=self.server.serve_forever,
+                         daemon=True).start()
+        host, port = self.server.server_address[:2]
+        self.url = f'http://{host}:{port}/data.csv'
+        self.pool = HttpConnectionPool()
+        self.resolvers = []
+
+    def tearDown(self):
+        for resolver in self.resolvers:
+            resolver.clear()
+        self.pool.clear()
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp_dir.cleanup()
+
+    def new_worker(self):
+        resolver = ResourceResolver()
+        resolver.define('remote', self.url, pool=self.pool,
+                        cache=DiskCache(self.cache_dir))
+        self.resolvers.append(resolver)
+        return resolver
+
+    def test_worker_with_a_warm_cache_does_not_download_again(self):
+        self.new_worker().get('remote')
+        self.server.statuses.clear()  # type: ignore
+
+        self.assertEqual(self.new_worker().get('remote'), 'x' * 1000)
+        self.assertEqual(self.server.statuses, [304])  # type: ignore
+
+    def test_worker_downloads_a_changed_resource_once(self):
+        self.new_worker().get('remote')
+        self.server.body = 'y' * 10  # type: ignore
+        self.server.statuses.clear()  # type: ignore
+
+        self.assertEqual(self.new_worker().get('remote'), 'y' * 10)
+        self.assertEqual(self.server.statuses, [200])  # type: ignore
+
+    def test_cold_cache_downloads_with_a_single_request(self):
+        self.assertEqual(self.new_worker().get('remote'), 'x' * 1000)
+        self.assertEqual(self.server.statuses, [200])  # type: ignore
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from resource_resolver import ResourceResolver, ResourceResolverError
+from resource_resolver.core.managers import HttpConnectionPool
+
+BODY = 'id,name\n1,alpha\n2,beta\n'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1  # type: ignore
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))  # type: ignore
+        if self.path == '/missing':
+            self._send(404, b'')
+            return
+        body = server.body.encode('utf-8')  # type: ignore
+        etag = f'"{len(server.body)}"'  # type: ignore
+        if self.headers.get('If-None-Match') == etag:
+            self._send(304, b'', etag=etag)
+            return
+        requested = self.headers.get('Range')
+        if requested and not server.ignore_range:  # type: ignore
+            start, end = requested[len('bytes='):].split('-')
+            stop = int(end) + 1 if end else len(body)
+            self._send(206, body[int(start):stop], etag=etag)
+            return
+        self._send(200, body, etag=etag)
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/csv; charset=utf-8')
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HttpManagerTestSuite(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        self.server.body = BODY  # type: ignore
+        self.server.requests = []  # type: ignore
+        self.server.connections = 0  # type: ignore
+        self.server.ignore_range = False  # type: ignore
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       daemon=True)
+        self.thread.start()
+        host, port = self.server.server_address[:2]
+        self.url = f'http://{host}:{port}/data.csv'
+
+        self.pool = HttpConnectionPool()
+        self.test_resolver = ResourceResolver()
+        self.test_resolver.define('remote', self.url, pool=self.pool)
+
+    def tearDown(self):
+        self.test_resolver.clear()
+        self.pool.clear()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_get_returns_the_response_body(self):
+        self.assertEqual(self.test_resolver.get('remote'), BODY)
+
+    def test_unchanged_resource_is_revalidated_rather_than_downloaded(self):
+        self.test_resolver.get('remote')
+        self.assertEqual(self.test_resolver.get('remote'), BODY)
+
+        second_request = self.server.requests[1]  # type: ignore
+        self.assertEqual(second_request.get('If-None-Match'), f'"{len(BODY)}"')
+
+    def test_changed_resource_is_downloaded_again(self):
+        self.test_resolver.get('remote')
+        self.server.body = 'id\n'  # type: ignore
+
+        self.assertEqual(self.test_resolver.get('remote'), 'id\n')
+
+    def test_connections_are_reused(self):
+        for _ in range(3):
+            self.test_resolver.get('remote')
+
+        self.assertEqual(self.server.connections, 1)  # type: ignore
+
+    def test_get_range_returns_partial_content(self):
+        self.assertEqual(self.test_resolver.get_range('remote', 0, 6),
+                         BODY[:7])
+        self.assertEqual(self.test_resolver.get_range('remote', 8), BODY[8:])
+
+    def test_get_range_reads_a_slice_when_the_server_ignores_ranges(self):
+        body = ''.join(f'{i:07d}\n' for i in range(20000))
+        self.server.body = body  # type: ignore
+        self.server.ignore_range = True  # type: ignore
+
+        self.assertEqual(self.test_resolver.get_range('remote', 65530, 65545),
+                         body[65530:65546])
+        self.assertEqual(self.test_resolver.get_range('remote', 159990),
+                         body[159990:])
+        self.assertEqual(self.server.connections, 1)  # type: ignore
+
+    def test_fingerprint_uses_etag(self):
+        fingerprint = self.test_resolver.fingerprint('remote')
+        self.assertIn(f'"{len(BODY)}"', fingerprint)
+
+    def test_saving_to_an_http_resource_throws_an_error(self):
+        with self.assertRaises(ResourceResolverError):
+            self.test_resolver.save('remote', 'abc')
+
+    def test_error_status_throws_an_error(self):
+        self.test_resolver.define('missing', self.url.replace('data.csv',
+                                                              'missing'),
+                                  pool=self.pool)
+        with self.assertRaises(ResourceResolverError):
+            self.test_resolver.get('missing')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,44 @@
+import asyncio
+import gc
 import io
+import os
 import pathlib
 import tempfile
 import unittest
+import weakref
+
+from typing import IO, Any, List
 
 from resource_resolver import ResourceResolver, ResourceResolverError
+from resource_resolver.core.managers import ResourceManagerBase
+
+CLOSED: List[str] = []
+
+
+class ClosingManager(ResourceManagerBase):
+    """
+    Records when it is closed, and has no finalizer of its own.
+    """
+
+    def __init__(self, location: str):
+        super().__init__(location)
+        self._location = location
+
+    @staticmethod
+    def test(location: Any) -> bool:
+        return isinstance(location, str) and location.startswith('closing://')
+
+    def put(self, data: IO[str]) -> None:
+        ...
+
+    def append(self, data: IO[str]) -> None:
+        ...
+
+    def get(self) -> IO[str]:
+        return io.StringIO('')
+
+    def close(self):
+        CLOSED.append(self._location)
 
 
 class BasicResourceResolverTestSuite(unittest.TestCase):
@@ -180,6 +215,173 @@ class ResourceResolverTestSuite(unittest.TestCase):
         with self.assertRaises(ResourceResolverError):
             resolver.save('abc123', contents)
 
+    def test_fingerprint_changes_after_saving_to_a_temporary_resource(self):
+        before = self.test_resolver.fingerprint(self.temp_key)
+        self.test_resolver.save(self.temp_key, 'new contents')
+
+        self.assertNotEqual(before, self.test_resolver.fingerprint(self.temp_key))
+
+    def test_fingerprint_changes_after_saving_to_a_file_resource(self):
+        before = self.test_resolver.fingerprint(self.file_path_key)
+        self.test_resolver.save(self.file_path_key, 'new, longer contents')
+
+        self.assertNotEqual(before, self.test_resolver.fingerprint(self.file_path_key))
+
+    def test_fingerprint_is_stable_for_an_unchanged_resource(self):
+        self.assertEqual(self.test_resolver.fingerprint(self.file_url_key),
+                         self.test_resolver.fingerprint(self.file_url_key))
+
+    def test_content_hash_fingerprint_detects_changes_preserving_stat(self):
+        self.test_resolver.define('hashed', self.test_path, overwrite=True,
+                                  content_hash=True)
+        stat = self.test_path.stat()
+        before = self.test_resolver.fingerprint('hashed')
+        self.test_resolver.save('hashed', 'Text test.')
+        os.utime(self.test_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        self.assertNotEqual(before, self.test_resolver.fingerprint('hashed'))
+
+    def test_defining_a_file_resource_does_not_open_the_file_until_used(self):
+        path = pathlib.Path(self.tmp_dir.name) / 'lazy.txt'
+        self.test_resolver.define('lazy', path)
+
+        self.assertFalse(path.exists())
+
+        self.test_resolver.save('lazy', 'abc')
+
+        self.assertEqual(self.test_resolver.get('lazy'), 'abc')
+
+    def test_cleared_resources_are_released(self):
+        self.test_resolver.define('released')
+        self.test_resolver.save('released', 'abc')
+        manager = weakref.ref(self.test_resolver._resource_map['released']._manager)
+
+        self.test_resolver.clear()
+        gc.collect()
+
+        self.assertIsNone(manager())
+
+    def test_clearing_closes_resources(self):
+        self.test_resolver.define('closing', 'closing://clear')
+        self.test_resolver.get('closing')
+        self.test_resolver.clear()
+
+        self.assertEqual(CLOSED.count('closing://clear'), 1)
+
+    def test_overwriting_a_definition_closes_the_previous_resource(self):
+        self.test_resolver.define('closing', 'closing://overwrite')
+        self.test_resolver.get('closing')
+        self.test_resolver.define('closing', overwrite=True)
+
+        self.assertEqual(CLOSED.count('closing://overwrite'), 1)
+
+    def test_released_resources_are_closed(self):
+        resolver = ResourceResolver()
+        resolver.define('closing', 'closing://released')
+        resolver.get('closing')
+        del resolver
+        gc.collect()
+
+        self.assertEqual(CLOSED.count('closing://released'), 1)
+
+    def test_saving_a_generator_of_chunks_streams_it_to_the_resource(self):
+        consumed = []
+
+        def chunks():
+            for i in range(3):
+                consumed.append(i)
+                yield f'line {i}\n'
+
+        self.test_resolver.save(self.file_path_key, chunks())
+
+        self.assertEqual(consumed, [0, 1, 2])
+        self.assertEqual(self.test_resolver.get(self.file_path_key),
+                         'line 0\nline 1\nline 2\n')
+
+    def test_saving_an_async_generator_of_chunks(self):
+        async def chunks():
+            for i in range(3):
+                yield f'{i},'
+
+        self.test_resolver.save(self.temp_key, chunks())
+
+        self.assertEqual(self.test_resolver.get(self.temp_key), '0,1,2,')
+
+    def test_asave_streams_an_async_generator_from_a_running_loop(self):
+        async def chunks():
+            for i in range(3):
+                await asyncio.sleep(0)
+                yield f'{i},'
+
+        asyncio.run(self.test_resolver.asave(self.temp_key, chunks()))
+
+        self.assertEqual(self.test_resolver.get(self.temp_key), '0,1,2,')
+
+    def test_aappend_adds_an_async_generator_from_a_running_loop(self):
+        self.test_resolver.save(self.temp_key, 'keep,')
+
+        async def chunks():
+            for i in range(2):
+                await asyncio.sleep(0)
+                yield f'{i},'
+
+        asyncio.run(self.test_resolver.aappend(self.temp_key, chunks()))
+
+        self.assertEqual(self.test_resolver.get(self.temp_key), 'keep,0,1,')
+
+    def test_append_adds_to_a_temporary_resource_after_it_is_read(self):
+        self.test_resolver.save(self.temp_key, 'abc')
+        self.test_resolver.get(self.temp_key)
+        self.test_resolver.append(self.temp_key, 'def')
+
+        self.assertEqual(self.test_resolver.get(self.temp_key), 'abcdef')
+
+    def test_previous_contents_survive_a_bad_chunk(self):
+        self.test_resolver.save(self.file_path_key, 'important data')
+
+        with self.assertRaises(ResourceResolverError):
+            self.test_resolver.save(self.file_path_key, ['ok', b'abc'])  # type: ignore
+
+        self.assertEqual(self.test_resolver.get(self.file_path_key),
+                         'important data')
+
+    def test_previous_contents_survive_a_failing_generator(self):
+        self.test_resolver.save(self.temp_key, 'important data')
+
+        def chunks():
+            yield 'partial'
+            raise ValueError()
+
+        with self.assertRaises(ValueError):
+            self.test_resolver.save(self.temp_key, chunks())
+
+        self.assertEqual(self.test_resolver.get(self.temp_key),
+                         'important data')
+
+    def test_saving_an_async_generator_inside_a_running_loop_throws_an_error(
+            self):
+        self.test_resolver.save(self.temp_key, 'keep me')
+
+        async def chunks():
+            yield 'abc'
+
+        async def save():
+            self.test_resolver.save(self.temp_key, chunks())
+
+        with self.assertRaises(ResourceResolverError):
+            asyncio.run(save())
+
+        self.assertEqual(self.test_resolver.get(self.temp_key), 'keep me')
+
+    def test_saving_non_string_chunks_throws_an_error(self):
+        with self.assertRaises(ResourceResolverError):
+            self.test_resolver.save(self.temp_key, [b'abc'])  # type: ignore
+
+
+    def test_saving_an_unordered_iterable_throws_an_error(self):
+        with self.assertRaises(ResourceResolverError):
+            self.test_resolver.save(self.temp_key, {'a', 'b'})
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,135 @@
+import os
+import pathlib
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from resource_resolver import ResourceResolver, ResourceResolverError
+from resource_resolver.core.managers import PackedStore
+
+
+class SqliteManagerTestSuite(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = pathlib.Path(self.tmp_dir.name) / 'store.db'
+        self.test_resolver = ResourceResolver()
+        self.test_resolver.define('config', f'sqlite://{self.db_path}#config')
+        self.test_resolver.define('state', f'sqlite://{self.db_path}#state')
+
+    def tearDown(self):
+        self.test_resolver.clear()
+        PackedStore.open(self.db_path).close()
+        self.tmp_dir.cleanup()
+
+    def test_get_returns_an_empty_string_for_a_new_resource(self):
+        self.assertEqual(self.test_resolver.get('config'), '')
+
+    def test_saved_data_is_returned(self):
+        self.test_resolver.save('config', 'a=1')
+        self.test_resolver.save('config', 'a=2')
+
+        self.assertEqual(self.test_resolver.get('config'), 'a=2')
+
+    def test_resources_in_one_store_are_independent(self):
+        self.test_resolver.save('config', 'a=1')
+        self.test_resolver.save('state', 'running')
+
+        self.assertEqual(self.test_resolver.get('config'), 'a=1')
+        self.assertEqual(self.test_resolver.get('state'), 'running')
+
+    def test_append_adds_to_existing_data(self):
+        self.test_resolver.save('state', 'a')
+        self.test_resolver.append('state', 'b')
+
+        self.assertEqual(self.test_resolver.get('state'), 'ab')
+
+    def test_data_persists_after_the_store_is_closed(self):
+        self.test_resolver.save('config', 'a=1')
+        PackedStore.open(self.db_path).close()
+
+        connection = sqlite3.connect(str(self.db_path))
+        row = connection.execute(
+            "SELECT data FROM resources WHERE key = 'config'").fetchone()
+        connection.close()
+
+        self.assertEqual(row[0], 'a=1')
+
+    def test_store_uses_wal_mode(self):
+        self.test_resolver.save('config', 'a=1')
+        connection = sqlite3.connect(str(self.db_path))
+        mode = connection.execute('PRAGMA journal_mode').fetchone()[0]
+        connection.close()
+
+        self.assertEqual(mode, 'wal')
+
+    def test_batch_commits_writes_together(self):
+        with PackedStore.open(self.db_path).batch():
+            self.test_resolver.save('config', 'a=1')
+            self.test_resolver.save('state', 'running')
+
+        self.assertEqual(self.test_resolver.get('config'), 'a=1')
+        self.assertEqual(self.test_resolver.get('state'), 'running')
+
+    def test_batch_is_rolled_back_on_error(self):
+        self.test_resolver.save('config', 'a=1')
+        with self.assertRaises(RuntimeError):
+            with PackedStore.open(self.db_path).batch():
+                self.test_resolver.save('config', 'a=2')
+                raise RuntimeError()
+
+        self.assertEqual(self.test_resolver.get('config'), 'a=1')
+
+    def test_batch_can_be_used_after_the_store_is_closed(self):
+        self.test_resolver.save('config', 'a=1')
+        PackedStore.open(self.db_path).close()
+
+        with PackedStore.open(self.db_path).batch():
+            self.test_resolver.save('config', 'a=2')
+            self.test_resolver.save('state', 'running')
+
+        self.assertEqual(self.test_resolver.get('config'), 'a=2')
+        self.assertEqual(self.test_resolver.get('state'), 'running')
+
+    def test_defining_a_location_without_a_key_throws_an_error(self):
+        with self.assertRaises(ResourceResolverError):
+            self.test_resolver.define('bad', f'sqlite://{self.db_path}')
+
+    def test_fingerprint_changes_after_saving(self):
+        before = self.test_resolver.fingerprint('config')
+        self.test_resolver.save('config', 'a=1')
+
+        self.assertNotEqual(before, self.test_resolver.fingerprint('config'))
+
+    def test_writes_through_a_file_handle_throw_an_error(self):
+        self.test_resolver.save('config', 'a=1')
+        handle = self.test_resolver.get('config', as_a='file_handle')
+
+        with self.assertRaises(ResourceResolverError):
+            handle.write('a=2')
+        self.assertEqual(handle.read(), 'a=1')
+
+    @unittest.skipUnless(os.path.isdir('/proc/self/fd'),
+                         'requires /proc to list open files')
+    def test_connections_are_not_held_per_thread(self):
+        self.test_resolver.save('config', 'a=1')
+
+        def read():
+            self.test_resolver.get('config')
+
+        for _ in range(20):
+            thread = threading.Thread(target=read)
+            thread.start()
+            thread.join()
+
+        descriptors = [os.readlink(f'/proc/self/fd/{fd}')
+                       for fd in os.listdir('/proc/self/fd')
+                       if os.path.exists(f'/proc/self/fd/{fd}')]
+        open_databases = [d for d in descriptors
+                          if d == str(self.db_path.resolve())]
+        self.assertGreaterEqual(len(open_databases), 1)
+        self.assertLessEqual(len(open_databases), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,21 @@
+import os
 from typing import cast
 
+import numpy as np
 import pandas as pd
 import pytest
 
-from resource_resolver import ResourceResolver
+from resource_resolver import (ResourceResolver, ResourceResolverError,
+                               get_resource_resolver)
 from resource_resolver.utils.pandas import (
-     append_dataframe_csv
+     DataFrameCache,
+     append_dataframe_csv,
+     configure_dataframe_cache,
+     disable_dataframe_cache,
+     get_csv_resource_as_dataframe,
+     get_feather_resource_as_dataframe,
+     get_feather_resource_as_table,
+     save_dataframe_feather,
 )
 
 
@@ -47,3 +57,135 @@ def test_append_csv_adds_rows(test_resolver, test_dataframe):
     df = cast(pd.DataFrame, pd.read_csv(fh))
 
     assert df.shape[0] == 8
+
+
+def test_saving_a_dataframe_directly_throws_an_error(test_resolver,
+                                                     test_dataframe):
+    with pytest.raises(ResourceResolverError):
+        test_resolver.save('test_dataframe', test_dataframe)
+
+
+@pytest.fixture
+def dataframe_cache(tmp_path):
+    cache = configure_dataframe_cache(spill_dir=tmp_path / 'spill')
+    yield cache
+    disable_dataframe_cache()
+
+
+@pytest.fixture
+def csv_resource(tmp_path, test_dataframe):
+    path = tmp_path / 'frame.csv'
+    test_dataframe.to_csv(path, index=False)
+    resolver = get_resource_resolver()
+    resolver.define('cached_csv', path, overwrite=True)
+    return resolver
+
+
+def test_cached_csv_read_does_not_reparse(dataframe_cache, csv_resource,
+                                          test_dataframe, monkeypatch):
+    first = get_csv_resource_as_dataframe('cached_csv')
+
+    def fail(*args, **kwargs):
+        raise AssertionError('read_csv should not be called.')
+    monkeypatch.setattr(pd, 'read_csv', fail)
+
+    second = get_csv_resource_as_dataframe('cached_csv')
+
+    pd.testing.assert_frame_equal(first, second)
+    assert second is not first
+
+
+def test_cached_csv_is_reparsed_after_save(dataframe_cache, csv_resource):
+    get_csv_resource_as_dataframe('cached_csv')
+    csv_resource.save('cached_csv', 'team,score\nBlack,1\n')
+
+    df = get_csv_resource_as_dataframe('cached_csv')
+
+    assert list(df.columns) == ['team', 'score']
+    assert df.shape[0] == 1
+
+
+def test_cached_dataframe_is_loaded_from_spill_dir(tmp_path, test_dataframe):
+    spill_dir = tmp_path / 'spill'
+    DataFrameCache(spill_dir=spill_dir).put('key', test_dataframe)
+
+    df = DataFrameCache(spill_dir=spill_dir).get('key')
+
+    pd.testing.assert_frame_equal(df, test_dataframe)
+
+
+def test_cache_key_covers_the_full_contents_of_large_arrays():
+    first = np.arange(2000)
+    second = first.copy()
+    second[1000] = -1
+
+    assert DataFrameCache.make_key('csv', usecols=first) != \
+        DataFrameCache.make_key('csv', usecols=second)
+    assert DataFrameCache.make_key('csv', usecols=pd.Index(first)) != \
+        DataFrameCache.make_key('csv', usecols=pd.Index(second))
+
+
+def test_cache_evicts_least_recently_used_entries(test_dataframe):
+    nbytes = int(test_dataframe.memory_usage(deep=True).sum())
+    cache = DataFrameCache(max_bytes=2 * nbytes)
+    cache.put('a', test_dataframe)
+    cache.put('b', test_dataframe)
+    cache.get('a')
+    cache.put('c', test_dataframe)
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.size <= 2 * nbytes
+
+
+@pytest.fixture
+def feather_resource(tmp_path):
+    resolver = get_resource_resolver()
+    resolver.define('feather_frame', overwrite=True)
+    resolver.save('feather_frame', str(tmp_path / 'frame.arrow'))
+    return resolver
+
+
+@pytest.mark.parametrize('compression', [None, 'zstd'])
+def test_feather_round_trip(feather_resource, test_dataframe, compression):
+    save_dataframe_feather('feather_frame', test_dataframe,
+                           compression=compression)
+
+    df = get_feather_resource_as_dataframe('feather_frame')
+
+    pd.testing.assert_frame_equal(df, test_dataframe)
+
+
+def test_feather_read_selects_columns(feather_resource, test_dataframe):
+    save_dataframe_feather('feather_frame', test_dataframe)
+
+    table = get_feather_resource_as_table('feather_frame', columns=['score'])
+
+    assert table.column_names == ['score']
+    assert table.column('score').to_pylist() == [100, 200, 300, 400]
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='requires POSIX permissions')
+def test_feather_file_has_the_default_permissions(feather_resource, tmp_path,
+                                                  test_dataframe):
+    save_dataframe_feather('feather_frame', test_dataframe)
+    umask = os.umask(0)
+    os.umask(umask)
+
+    mode = (tmp_path / 'frame.arrow').stat().st_mode & 0o777
+    assert mode == 0o666 & ~umask
+
+
+def test_chunked_csv_read_bypasses_the_cache(dataframe_cache, csv_resource):
+    reader = get_csv_resource_as_dataframe('cached_csv', chunksize=2)
+
+    assert sum(chunk.shape[0] for chunk in reader) == 4
+
+
+def test_spill_dir_is_held_to_its_budget(tmp_path, test_dataframe):
+    spill_dir = tmp_path / 'spill'
+    cache = DataFrameCache(spill_dir=spill_dir, max_spill_bytes=1)
+    cache.put('a', test_dataframe)
+    cache.put('b', test_dataframe)
+
+    assert [p.name for p in spill_dir.glob('*.arrow')] == ['b.arrow']